@@ -0,0 +1,127 @@
+import argparse
+import os
+import random
+import time
+import numpy as np
+
+# Headless: the dummy video driver still gives a real display surface to draw on
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import pygame
+from game_objects import Fruit
+from game_engine import GameEngine
+from rotation_cache import get_rotation_cache
+from particles import ParticleSystem
+from sprite_assets import FRUIT_COLORS
+
+# Per-frame draw time of fruits, fruit halves and the katana, with and without
+# the rotation cache, and of the juice particle system on its own.
+
+def run(screen, engine, count, frames, warmup, cached, sliced_share=0.25):
+    cache = get_rotation_cache()
+    cache.enabled = cached
+    cache.clear()
+    width, height = screen.get_size()
+    random.seed(1)
+    fruits = [Fruit(width, height) for _ in range(count)]
+    for fruit in fruits:
+        # Spread fruits over their flight instead of all starting below the screen
+        fruit.y = random.uniform(0, height)
+
+    times = []
+    for frame in range(warmup + frames):
+        now = pygame.time.get_ticks()
+        for i, fruit in enumerate(fruits):
+            # Keep a share of fruits in the slice animation so halves are drawn too
+            if i < count * sliced_share and (not fruit.sliced or now - fruit.slice_time > 1000):
+                fruit.sliced = True
+                fruit.slice_time = now
+                fruit.slice_direction = random.uniform(0, 360)
+
+        start = time.perf_counter()
+        screen.fill((20, 20, 50))
+        for fruit in fruits:
+            fruit.update()
+            fruit.draw(screen)
+        angle = frame * 7.0
+        position = (width // 2 + int(200 * np.cos(frame * 0.05)), height // 2)
+        engine.draw_katana(screen, position, angle)
+        if frame >= warmup:
+            times.append(time.perf_counter() - start)
+
+    ms = np.array(times) * 1000.0
+    return {
+        'fruits': count,
+        'cached': cached,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'cache': cache.get_stats()
+    }
+
+def run_particles(screen, count, frames, warmup):
+    """Update and draw cost with about count particles alive"""
+    system = ParticleSystem(capacity=count)
+    width, height = screen.get_size()
+    colors = list(FRUIT_COLORS.values())
+    per_frame = -(-count // system.lifetime)  # Keeps the system full
+    random.seed(1)
+
+    update_times, draw_times = [], []
+    for frame in range(warmup + frames):
+        for _ in range(-(-per_frame // 25)):
+            system.emit(random.uniform(0, width), random.uniform(0, height / 2), random.choice(colors),
+                        count=min(25, per_frame), direction=random.uniform(0, 360))
+        screen.fill((20, 20, 50))
+        start = time.perf_counter()
+        system.update()
+        updated = time.perf_counter()
+        system.draw(screen)
+        if frame >= warmup:
+            update_times.append(updated - start)
+            draw_times.append(time.perf_counter() - updated)
+
+    return {
+        'particles': len(system),
+        'update_ms': float(np.percentile(update_times, 50)) * 1000.0,
+        'draw_ms': float(np.percentile(draw_times, 50)) * 1000.0,
+        'sprites': len(system.sprites)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame fruit and katana draw time")
+    parser.add_argument('--counts', type=int, nargs='+', default=[8, 200])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=60,
+                        help="untimed frames; with the cache on these also fill it")
+    parser.add_argument('--particles', type=int, nargs='*', default=[200, 1000, 5000],
+                        help="live particle counts for the particle system benchmark")
+    parser.add_argument('--size', default='1024x768', metavar='WxH')
+    parser.add_argument('--rotation-cache-mib', type=float, default=64,
+                        help="rotation cache size; evictions at high fruit counts drop as it grows")
+    args = parser.parse_args()
+    get_rotation_cache().max_bytes = int(args.rotation_cache_mib * 1024 * 1024)
+
+    pygame.init()
+    screen = pygame.display.set_mode(tuple(int(v) for v in args.size.lower().split('x')))
+    engine = GameEngine(*screen.get_size())
+
+    print(f"{'fruits':>6} {'cache':>5} {'p50':>7} {'p95':>7}  (ms per frame)")
+    for count in args.counts:
+        for cached in (False, True):
+            r = run(screen, engine, count, args.frames, args.warmup, cached)
+            line = f"{r['fruits']:>6} {'on' if cached else 'off':>5} {r['p50_ms']:7.2f} {r['p95_ms']:7.2f}"
+            if cached:
+                stats = r['cache']
+                line += (f"  {stats['entries']} rotations, {stats['mib']:.1f} MiB, "
+                         f"{stats['hit_rate']:.1%} hits, {stats['evictions']} evicted")
+            print(line)
+
+    if args.particles:
+        print(f"{'particles':>9} {'update':>7} {'draw':>7}  (ms per frame, p50)")
+        for count in args.particles:
+            r = run_particles(screen, count, args.frames, args.warmup)
+            print(f"{r['particles']:>9} {r['update_ms']:7.3f} {r['draw_ms']:7.2f}  {r['sprites']} sprites")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
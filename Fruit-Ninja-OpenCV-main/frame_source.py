@@ -0,0 +1,256 @@
+import cv2
+import glob
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+# Frame sources share the subset of the cv2.VideoCapture interface the apps
+# use (read/isOpened/get/set/release), so they can be swapped in anywhere.
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+class CameraSource:
+    """Live webcam capture"""
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+
+    def read(self):
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+class FileSource:
+    """Replays a video file or an image sequence, decoding ahead on a background thread"""
+
+    def __init__(self, path, realtime=True, fps=None, loop=False, prefetch=8):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.image_files = self._find_images(path)
+        self.video = None
+
+        if self.image_files is None:
+            self.video = cv2.VideoCapture(path)
+            if not self.video.isOpened():
+                raise IOError(f"Could not open video file: {path}")
+            self.fps = fps or self.video.get(cv2.CAP_PROP_FPS) or 30.0
+            self.frame_count = int(self.video.get(cv2.CAP_PROP_FRAME_COUNT))
+        else:
+            if not self.image_files:
+                raise IOError(f"No images found for: {path}")
+            self.fps = fps or 30.0
+            self.frame_count = len(self.image_files)
+
+        self.frame_size = (0, 0)
+        self.frames = queue.Queue(maxsize=prefetch)
+        self.frames_read = 0
+        self.start_time = None
+        self.finished = False
+        self.running = True
+
+        self.thread = threading.Thread(target=self._decode_loop, name="FileSourceDecoder", daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def _find_images(path):
+        # Directories and glob patterns are image sequences, anything else is a video
+        if os.path.isdir(path):
+            files = [os.path.join(path, f) for f in os.listdir(path)]
+        elif any(c in path for c in '*?['):
+            files = glob.glob(path)
+        else:
+            return None
+        return sorted(f for f in files if f.lower().endswith(IMAGE_EXTENSIONS))
+
+    def _decode_frames(self):
+        if self.video is not None:
+            while self.running:
+                ret, frame = self.video.read()
+                if not ret:
+                    return
+                yield frame
+        else:
+            for path in self.image_files:
+                if not self.running:
+                    return
+                frame = cv2.imread(path)
+                if frame is not None:
+                    yield frame
+
+    def _decode_loop(self):
+        try:
+            while self.running:
+                for frame in self._decode_frames():
+                    self.frame_size = (frame.shape[1], frame.shape[0])
+                    # Blocks when the prefetch queue is full, so order is always preserved
+                    while self.running:
+                        try:
+                            self.frames.put(frame, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+
+                if not self.loop:
+                    break
+                if self.video is not None:
+                    self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        except Exception as e:
+            print(f"Decode error: {e}")
+        finally:
+            # End-of-stream marker, also pushed when decoding failed
+            while self.running:
+                try:
+                    self.frames.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def read(self):
+        if self.finished:
+            return False, None
+
+        # Poll so a reader is never left blocked once the source is released
+        while True:
+            try:
+                frame = self.frames.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self.running:
+                    frame = None
+                    break
+        if frame is None:
+            self.finished = True
+            return False, None
+
+        if self.realtime:
+            # Pace delivery to the source frame rate from the first read
+            if self.start_time is None:
+                self.start_time = time.perf_counter()
+            delay = self.start_time + self.frames_read / self.fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.frames_read += 1
+        return True, frame
+
+    def isOpened(self):
+        return not self.finished
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.frame_count
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.frame_size[0]
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.frame_size[1]
+        return 0
+
+    def set(self, prop, value):
+        # Recorded footage has a fixed format
+        return False
+
+    def release(self):
+        self.running = False
+        # Unblock the decoder if it is waiting on a full queue
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+        self.thread.join(1.0)
+        if self.video is not None:
+            self.video.release()
+        self.finished = True
+
+class SyntheticSource:
+    """Deterministic generated frames: a skin-toned blob moving over a textured background"""
+
+    def __init__(self, width=640, height=480, fps=30.0, seed=0, realtime=False, frame_count=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.realtime = realtime
+        self.frame_count = frame_count
+        self.frames_read = 0
+        self.start_time = None
+        self.released = False
+
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(40, 120, width, dtype=np.float32)
+        background = np.empty((height, width, 3), dtype=np.float32)
+        background[:] = gradient[None, :, None]
+        background += rng.normal(0, 8, size=background.shape)
+        self.background = np.clip(background, 0, 255).astype(np.uint8)
+        self.frame = np.empty_like(self.background)
+
+    def read(self):
+        if self.released or (self.frame_count is not None and self.frames_read >= self.frame_count):
+            return False, None
+
+        if self.realtime:
+            if self.start_time is None:
+                self.start_time = time.perf_counter()
+            delay = self.start_time + self.frames_read / self.fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        # Lissajous path so the motion covers the frame without randomness
+        t = self.frames_read / self.fps
+        cx = int(self.width * (0.5 + 0.35 * np.sin(1.3 * t)))
+        cy = int(self.height * (0.5 + 0.35 * np.sin(0.9 * t + 0.5)))
+        radius = max(8, min(self.width, self.height) // 8)
+
+        np.copyto(self.frame, self.background)
+        cv2.ellipse(self.frame, (cx, cy), (radius, int(radius * 1.3)), 0, 0, 360, (140, 170, 220), -1)
+        cv2.circle(self.frame, (cx, cy - int(radius * 1.6)), radius // 3, (140, 170, 220), -1)
+
+        self.frames_read += 1
+        return True, self.frame.copy()
+
+    def isOpened(self):
+        return not self.released
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.frame_count or 0
+        return 0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.released = True
+
+def open_frame_source(spec=0, realtime=True):
+    """Open a source from a camera index, a video/image path or 'synthetic[:WxH]'"""
+    if spec is None:
+        spec = 0
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if spec.startswith('synthetic'):
+        width, height = 640, 480
+        if ':' in spec:
+            width, height = (int(v) for v in spec.split(':', 1)[1].lower().split('x'))
+        return SyntheticSource(width, height, realtime=realtime)
+    return FileSource(spec, realtime=realtime)
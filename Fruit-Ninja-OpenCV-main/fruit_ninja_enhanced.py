@@ -1,11 +1,20 @@
+import argparse
 import pygame
 import cv2
 import math
 import os
+import time
 import numpy as np
 from hand_tracking import HandTracker
 from game_objects import Fruit, BladeTrail
 from game_engine import GameEngine
+from frame_source import open_frame_source
+from camera_config import configure_camera
+from landmark_log import LandmarkRecorder
+from stage_timer import StageTimer
+from sprite_assets import get_registry
+from particles import get_particle_system
+from rotation_cache import get_rotation_cache
 
 # Initialize Pygame
 pygame.init()
@@ -30,7 +39,9 @@ PREVIEW_SIZE = (320, 240)
 PREVIEW_PADDING = 20
 
 class FruitNinja:
-    def __init__(self):
+    def __init__(self, source=0, record_path=None, roi_tracking=False, latency_budget_ms=None,
+                 hud=False, stage_log=None, negotiate_camera=False, max_hands=1, preview_fps=30):
+        start = time.perf_counter()
         # Create required directories
         for dir_name in ['fruits', 'cursor', 'sounds', 'fonts', 'background']:
             os.makedirs(dir_name, exist_ok=True)
@@ -41,26 +52,47 @@ class FruitNinja:
         pygame.display.set_caption("Fruit Ninja Ultimate Enhanced")
         self.clock = pygame.time.Clock()
         
+        # Sprites load in the background while audio, MediaPipe and the camera start
+        self.sprites = get_registry().preload()
+        
         # Calculate scaling factors for different resolutions
         self.update_screen_scaling()
         
         # Initialize game components
         self.engine = GameEngine(self.screen_width, self.screen_height)
-        self.hand_tracker = HandTracker()
+        self.hand_tracker = HandTracker(roi_tracking=roi_tracking, latency_budget_ms=latency_budget_ms,
+                                        max_hands=max_hands)
+        if record_path:
+            self.hand_tracker.recorder = LandmarkRecorder(record_path)
+        
+        # Per-stage frame timings, shown with H and optionally logged as JSON lines
+        self.stage_timer = StageTimer(export_path=stage_log)
+        self.hand_tracker.stage_timer = self.stage_timer
+        self.show_hud = hud
         self.blade_trail = BladeTrail(self.screen_width, self.screen_height)
         
-        # Initialize fruits
-        self.fruits = [Fruit(self.screen_width, self.screen_height) for _ in range(5)]
+        # Initialize camera (or a recorded/synthetic source)
+        self.cap = open_frame_source(source)
+        configure_camera(self.cap, 640, 480, negotiate_mode=negotiate_camera)
         
-        # Initialize camera
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        # Initialize fruits; the first one waits for the sprite preload, so
+        # they come after everything it is meant to overlap
+        self.particles = get_particle_system()
+        self.fruits = [Fruit(self.screen_width, self.screen_height, self.sprites, self.particles)
+                       for _ in range(5)]
         
         # Create static surfaces
         self.preview_bg = pygame.Surface((PREVIEW_SIZE[0] + 4, PREVIEW_SIZE[1] + 4))
         self.preview_bg.fill(UI_WHITE)
         
+        # Camera preview: persistent buffers refreshed in place at preview_fps
+        # (0 hides it); between refreshes the last preview is blitted again
+        self.preview_fps = preview_fps
+        self.preview_surface = pygame.Surface(PREVIEW_SIZE)
+        self.preview_small = np.zeros((PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3), dtype=np.uint8)
+        self.preview_rgb = np.zeros_like(self.preview_small)
+        self.preview_time = None
+        
         # UI Elements
         try:
             self.font = pygame.font.Font('fonts/ninja.ttf', 36)
@@ -68,6 +100,9 @@ class FruitNinja:
         except:
             self.font = pygame.font.Font(None, 36)
             self.small_font = pygame.font.Font(None, 24)
+        
+        print(self.sprites.format_report())
+        print(f"Startup: {(time.perf_counter() - start) * 1000.0:.0f} ms")
     
     def update_screen_scaling(self):
         # Get current screen dimensions
@@ -103,29 +138,32 @@ class FruitNinja:
         # Scale to screen coordinates
         return int(x * self.screen_width), int(y * self.screen_height)
     
-    def frame_to_surface(self, frame):
+    def frame_to_surface(self, frame, hand_pos=None, velocity=None):
+        """Refresh the persistent preview surface from a camera frame"""
         try:
             # Resize frame for preview
-            frame = cv2.resize(frame, PREVIEW_SIZE)
-            # Convert from BGR to RGB and rotate correctly
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # Create pygame surface
-            surface = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
-            return surface
+            cv2.resize(frame, PREVIEW_SIZE, dst=self.preview_small)
+            # Tracking overlay at preview resolution
+            if hand_pos is not None:
+                self.hand_tracker.draw_tracking_info(self.preview_small, hand_pos, velocity,
+                                                     scale=PREVIEW_SIZE[0] / frame.shape[1])
+            # Convert from BGR to RGB and copy into the surface, transposed to (w, h)
+            cv2.cvtColor(self.preview_small, cv2.COLOR_BGR2RGB, dst=self.preview_rgb)
+            pygame.surfarray.blit_array(self.preview_surface, self.preview_rgb.swapaxes(0, 1))
         except Exception as e:
             print(f"Error converting frame: {e}")
-            # Return black surface if conversion fails
-            surface = pygame.Surface(PREVIEW_SIZE)
-            surface.fill((0, 0, 0))
-            return surface
+            # Show a black preview if conversion fails
+            self.preview_surface.fill((0, 0, 0))
+        return self.preview_surface
     
     def draw_camera_preview(self, frame, hand_pos, velocity):
+        if not self.preview_fps:
+            return
         try:
-            # Draw tracking visualization
-            preview_frame = self.hand_tracker.draw_tracking_info(frame.copy(), hand_pos, velocity)
-            
-            # Convert frame to pygame surface
-            preview_surface = self.frame_to_surface(preview_frame)
+            now = time.perf_counter()
+            if self.preview_time is None or now - self.preview_time >= 1.0 / self.preview_fps:
+                self.preview_time = now
+                self.frame_to_surface(frame, hand_pos, velocity)
             
             # Calculate preview position (bottom-right corner)
             preview_x = self.screen_width - PREVIEW_SIZE[0] - PREVIEW_PADDING
@@ -135,23 +173,16 @@ class FruitNinja:
             self.screen.blit(self.preview_bg, (preview_x - 2, preview_y - 2))
             
             # Draw preview
-            self.screen.blit(preview_surface, (preview_x, preview_y))
+            self.screen.blit(self.preview_surface, (preview_x, preview_y))
             
             # Draw connection line between hand and cursor if hand is detected
             if hand_pos[0] is not None and hand_pos[1] is not None:
                 game_x, game_y = self.scale_position(hand_pos[0], hand_pos[1])
                 preview_hand_x = preview_x + int(hand_pos[0] * PREVIEW_SIZE[0])
                 preview_hand_y = preview_y + int(hand_pos[1] * PREVIEW_SIZE[1])
-                
-                # Draw connecting line with fade effect
-                for i in range(3):
-                    alpha = 150 - i * 40
-                    color = (*UI_BLUE[:3], alpha)
-                    line_surface = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-                    pygame.draw.line(line_surface, color, 
-                                  (preview_hand_x, preview_hand_y),
-                                  (game_x, game_y), 2)
-                    self.screen.blit(line_surface, (0, 0))
+                pygame.draw.line(self.screen, UI_BLUE,
+                                 (preview_hand_x, preview_hand_y),
+                                 (game_x, game_y), 2)
         
         except Exception as e:
             print(f"Error drawing preview: {e}")
@@ -159,7 +190,7 @@ class FruitNinja:
     def update_fruits(self):
         active_fruits = sum(1 for fruit in self.fruits if not fruit.sliced)
         if active_fruits < 3:
-            self.fruits.append(Fruit(self.screen_width, self.screen_height))
+            self.fruits.append(Fruit(self.screen_width, self.screen_height, self.sprites, self.particles))
             if len(self.fruits) > 8:
                 self.fruits.pop(0)
     
@@ -226,9 +257,20 @@ class FruitNinja:
                         50 * self.scale_y)
             self.screen.blit(scaled_surface, combo_pos)
     
+    def draw_hud(self):
+        # Stage latency percentiles in the top-right corner
+        y = 20 * self.scale_y
+        for line in self.stage_timer.hud_lines():
+            surface = self.small_font.render(line, True, UI_WHITE)
+            self.screen.blit(surface, (self.screen_width - surface.get_width() - 20, y))
+            y += surface.get_height()
+    
     def run(self):
+        timer = self.stage_timer
         running = True
         while running:
+            timer.begin()
+            
             # Event handling
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -241,15 +283,21 @@ class FruitNinja:
                             running = False
                     elif event.key == pygame.K_f:
                         self.toggle_fullscreen()
+                    elif event.key == pygame.K_h:
+                        self.show_hud = not self.show_hud
             
             # Draw background
             self.engine.draw_background(self.screen)
+            timer.mark('render')
             
             # Process hand tracking
             ret, frame = self.cap.read()
             if ret:
+                capture_time = time.perf_counter()
                 frame = cv2.flip(frame, 1)
-                hand_x, hand_y, velocity, vel_vector = self.hand_tracker.get_hand_position(frame)
+                timer.mark('capture')
+                hand_x, hand_y, velocity, vel_vector = self.hand_tracker.get_hand_position(frame, capture_time)
+                timer.mark('gesture')
                 
                 if hand_x is not None:
                     # Scale position to screen coordinates
@@ -269,27 +317,71 @@ class FruitNinja:
                     
                     # Check collisions
                     self.check_collisions(self.blade_trail.points)
+                timer.mark('update')
                 
                 # Draw camera preview with tracking visualization
                 self.draw_camera_preview(frame, (hand_x, hand_y), vel_vector)
+                timer.mark('render')
             
             # Update and draw fruits
             self.update_fruits()
             for fruit in self.fruits:
                 fruit.update()
+            timer.mark('update')
+            # Juice sits under the fruit halves; timed on its own
+            self.particles.update()
+            self.particles.draw(self.screen)
+            timer.mark('particles')
+            for fruit in self.fruits:
                 fruit.draw(self.screen)
             
             # Draw UI
             self.draw_ui()
+            if self.show_hud:
+                self.draw_hud()
             
             # Update display
             pygame.display.flip()
+            timer.mark('render')
+            timer.end_frame()
             self.clock.tick(FPS)
         
         # Cleanup
         self.cap.release()
+        if self.hand_tracker.recorder:
+            self.hand_tracker.recorder.close()
+        if timer.counts:
+            print(timer.format_summary())
+        timer.close()
         pygame.quit()
 
 if __name__ == "__main__":
-    game = FruitNinja()
+    parser = argparse.ArgumentParser(description="Fruit Ninja")
+    parser.add_argument('--source', default='0',
+                        help="camera index, video file, image directory/glob or 'synthetic'")
+    parser.add_argument('--record', metavar='PATH',
+                        help="append detected landmarks to a landmark log")
+    parser.add_argument('--roi', action='store_true',
+                        help="track the hand in a crop around its last position")
+    parser.add_argument('--latency-budget', type=float, metavar='MS',
+                        help="adapt inference resolution, model and frame skipping to this per-frame budget")
+    parser.add_argument('--preview-fps', type=float, default=30,
+                        help="camera preview refresh rate, below the game's 60 fps (0 hides the preview)")
+    parser.add_argument('--max-hands', type=int, default=1,
+                        help="hands to track; the blade follows the hand seen first")
+    parser.add_argument('--negotiate-camera', action='store_true',
+                        help="probe camera formats and frame rates and use the lowest-latency mode")
+    parser.add_argument('--hud', action='store_true',
+                        help="show per-stage latency percentiles (toggle with H)")
+    parser.add_argument('--stage-log', metavar='PATH',
+                        help="append per-frame stage timings to a JSON-lines file")
+    parser.add_argument('--rotation-cache-mib', type=float, default=64,
+                        help="memory for cached sprite rotations; more avoids re-rotating with many fruits")
+    args = parser.parse_args()
+    
+    get_rotation_cache().max_bytes = int(args.rotation_cache_mib * 1024 * 1024)
+    game = FruitNinja(source=args.source, record_path=args.record, roi_tracking=args.roi,
+                      latency_budget_ms=args.latency_budget, hud=args.hud,
+                      stage_log=args.stage_log, negotiate_camera=args.negotiate_camera,
+                      max_hands=args.max_hands, preview_fps=args.preview_fps)
     game.run()
\ No newline at end of file
@@ -2,6 +2,7 @@ import pygame
 import os
 import math
 import random
+from rotation_cache import get_rotation_cache
 
 class GameEngine:
     def __init__(self, window_width, window_height):
@@ -37,10 +38,15 @@ class GameEngine:
         try:
             self.katana = pygame.image.load('cursor/katana.png')
             self.katana = pygame.transform.scale(self.katana, (150, 150))
+            if pygame.display.get_surface() is not None:
+                self.katana = self.katana.convert_alpha()
         except:
             self.katana = pygame.Surface((150, 150), pygame.SRCALPHA)
             pygame.draw.line(self.katana, (255, 255, 255), (0, 75), (150, 75), 5)
         
+        # Rotated katanas are shared with the motion trail ghosts
+        self.rotations = get_rotation_cache()
+        
         # Load background
         try:
             self.background = pygame.image.load('background/dojo.png')
@@ -110,19 +116,16 @@ class GameEngine:
         # Draw motion trail
         for i, (pos, ang) in enumerate(self.prev_positions[:-1]):
             alpha = 100 - (i * 30)  # Fade out trailing images
-            ghost = self.katana.copy()
-            ghost.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
-            
             smooth_angle = self.get_smooth_angle(ang)
-            rotated = pygame.transform.rotate(ghost, smooth_angle)
-            rect = rotated.get_rect(center=pos)
-            screen.blit(rotated, rect)
+            # Surface alpha scales the per-pixel alpha, so ghosts need no faded copy
+            ghost = self.rotations.get('katana', self.katana, smooth_angle)
+            ghost.set_alpha(alpha)
+            screen.blit(ghost, ghost.get_rect(center=pos))
+            ghost.set_alpha(255)
         
         # Draw main katana with smooth rotation and slight wobble
         smooth_angle = self.get_smooth_angle(angle)
         wobble = math.sin(pygame.time.get_ticks() * 0.01) * 2
         final_angle = smooth_angle + wobble
         
-        rotated_katana = pygame.transform.rotate(self.katana, final_angle)
-        katana_rect = rotated_katana.get_rect(center=position)
-        screen.blit(rotated_katana, katana_rect)
\ No newline at end of file
+        self.rotations.blit(screen, 'katana', self.katana, final_angle, position)
\ No newline at end of file
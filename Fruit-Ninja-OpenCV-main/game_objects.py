@@ -1,46 +1,25 @@
 import pygame
 import random
 import math
-import os
+from sprite_assets import FRUIT_COLORS, get_registry
+from rotation_cache import get_rotation_cache
+from particles import get_particle_system
 
 class Fruit:
-    def __init__(self, window_width, window_height):
+    def __init__(self, window_width, window_height, registry=None, particles=None):
         self.WINDOW_WIDTH = window_width
         self.WINDOW_HEIGHT = window_height
-        self.images = {}
-        self.particles = []
+        # Juice goes to a particle system shared by all fruits
+        self.particles = particles if particles is not None else get_particle_system()
         
         # Fruit juice colors and effects
-        self.fruit_colors = {
-            'apple': (255, 50, 50),
-            'orange': (255, 165, 0),
-            'banana': (255, 255, 0),
-            'watermelon': (255, 50, 100),
-            'pear': (170, 255, 50)
-        }
-        
-        # Load fruit images
-        image_files = {
-            'apple': 'fruits/apple.png',
-            'orange': 'fruits/orange.png',
-            'banana': 'fruits/banana.png',
-            'watermelon': 'fruits/watermelon.png',
-            'pear': 'fruits/pear.png'
-        }
+        self.fruit_colors = FRUIT_COLORS
         
-        for name, path in image_files.items():
-            try:
-                self.images[name] = pygame.image.load(path)
-                self.images[name] = pygame.transform.scale(self.images[name], (80, 80))
-            except:
-                surface = pygame.Surface((80, 80), pygame.SRCALPHA)
-                color = self.fruit_colors.get(name, (255, 0, 0))
-                pygame.draw.circle(surface, color, (40, 40), 40)
-                # Add shine effect
-                highlight = pygame.Surface((80, 80), pygame.SRCALPHA)
-                pygame.draw.circle(highlight, (255, 255, 255, 50), (30, 30), 20)
-                surface.blit(highlight, (0, 0))
-                self.images[name] = surface
+        # Sprites are shared by all fruits and loaded only once
+        registry = registry or get_registry()
+        self.images = registry.get()
+        self.halves = registry.get_halves()
+        self.rotations = get_rotation_cache()
         
         self.reset()
     
@@ -63,20 +42,9 @@ class Fruit:
         color = self.fruit_colors.get(self.type, (255, 100, 0))
         perpendicular = slice_angle + 90  # Particles spray perpendicular to slice
         
-        for _ in range(25):  # Increased particle count
-            # Angle spread based on slice direction
-            angle = math.radians(perpendicular + random.uniform(-45, 45))
-            speed = random.uniform(10, 20)  # Increased particle speed
-            
-            particle = {
-                'pos': [self.x, self.y],
-                'vel': [speed * math.cos(angle), speed * math.sin(angle)],
-                'timer': 60,  # Increased lifetime
-                'color': color,
-                'size': random.uniform(2, 6),
-                'alpha': 255
-            }
-            self.particles.append(particle)
+        # Angle spread based on slice direction
+        self.particles.emit(self.x, self.y, color, count=25, direction=perpendicular, spread=45,
+                            speed=(10, 20), size=(2, 6))
     
     def update(self):
         if not self.sliced:
@@ -92,37 +60,15 @@ class Fruit:
             
             if self.y > self.WINDOW_HEIGHT + 50:
                 self.reset()
-        else:
-            for particle in self.particles[:]:
-                particle['pos'][0] += particle['vel'][0]
-                particle['pos'][1] += particle['vel'][1]
-                particle['vel'][1] += 0.3
-                particle['timer'] -= 1
-                particle['alpha'] = max(0, particle['alpha'] - 4)
-                if particle['timer'] <= 0:
-                    self.particles.remove(particle)
     
     def draw(self, screen):
         if not self.sliced:
-            rotated_image = pygame.transform.rotate(self.images[self.type], self.rotation)
-            rect = rotated_image.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(rotated_image, rect)
+            self.rotations.blit(screen, self.type, self.images[self.type], self.rotation,
+                                (int(self.x), int(self.y)))
         else:
-            # Draw particles with alpha
-            for particle in self.particles:
-                color = list(particle['color'])
-                if len(color) == 3:
-                    color.append(int(particle['alpha']))
-                surf = pygame.Surface((int(particle['size'] * 2), int(particle['size'] * 2)), pygame.SRCALPHA)
-                pygame.draw.circle(surf, color,
-                                (int(particle['size']), int(particle['size'])),
-                                int(particle['size']))
-                screen.blit(surf, (int(particle['pos'][0] - particle['size']),
-                                 int(particle['pos'][1] - particle['size'])))
-            
             # Enhanced slicing animation
             if pygame.time.get_ticks() - self.slice_time < 1000:
-                base_image = self.images[self.type]
+                left_half, right_half = self.halves[self.type]
                 slice_progress = (pygame.time.get_ticks() - self.slice_time) / 1000.0
                 slice_dir = math.radians(self.slice_direction)
                 
@@ -134,26 +80,22 @@ class Fruit:
                 right_offset_y = math.sin(slice_dir) * separation
                 
                 # Left half with enhanced rotation and movement
-                left_half = pygame.Surface((40, 80), pygame.SRCALPHA)
-                left_half.blit(base_image, (0, 0))
                 left_angle = self.rotation + slice_progress * 360 * self.left_rotation
-                left_rotated = pygame.transform.rotate(left_half, left_angle)
-                left_rect = left_rotated.get_rect(center=(
+                self.rotations.blit(screen, (self.type, 'left'), left_half, left_angle, (
                     self.x + left_offset_x,
                     self.y + left_offset_y + slice_progress * 100  # Add downward motion
                 ))
-                screen.blit(left_rotated, left_rect)
                 
                 # Right half with enhanced rotation and movement
-                right_half = pygame.Surface((40, 80), pygame.SRCALPHA)
-                right_half.blit(base_image, (-40, 0))
                 right_angle = self.rotation + slice_progress * 360 * self.right_rotation
-                right_rotated = pygame.transform.rotate(right_half, right_angle)
-                right_rect = right_rotated.get_rect(center=(
+                self.rotations.blit(screen, (self.type, 'right'), right_half, right_angle, (
                     self.x + right_offset_x,
                     self.y + right_offset_y + slice_progress * 100  # Add downward motion
                 ))
-                screen.blit(right_rotated, right_rect)
+
+def _premultiplied(color):
+    r, g, b, a = color
+    return r * a // 255, g * a // 255, b * a // 255, a
 
 class BladeTrail:
     def __init__(self, window_width, window_height):
@@ -167,10 +109,14 @@ class BladeTrail:
             (50, 150, 255, 150),
             (0, 100, 255, 100)
         ]
-        self.surfaces = []
-        for _ in self.colors:
-            surface = pygame.Surface((window_width, window_height), pygame.SRCALPHA)
-            self.surfaces.append(surface)
+        # Scratch surfaces covering only the trail's bounding box; they grow
+        # as needed and are reused every frame. All three hold premultiplied
+        # alpha, so the layers stack in the composite exactly as they would
+        # on the screen and reach it in one blit
+        self.glow = None
+        self.layer = None
+        self.composite = None
+        self.padding = (12 + (len(self.colors) - 1) * 4) // 2 + 3  # Half the widest glow line plus jitter
         
         # Trail fade effect
         self.fade_start = None
@@ -192,26 +138,46 @@ class BladeTrail:
                 if self.points:
                     self.points.pop(0)
     
+    def _scratch(self, width, height):
+        if self.glow is None or self.glow.get_width() < width or self.glow.get_height() < height:
+            size = (max(width, self.glow.get_width() if self.glow else 0),
+                    max(height, self.glow.get_height() if self.glow else 0))
+            self.glow = pygame.Surface(size, pygame.SRCALPHA)
+            self.layer = pygame.Surface(size, pygame.SRCALPHA)
+            self.composite = pygame.Surface(size, pygame.SRCALPHA)
+    
     def draw(self, screen):
-        if len(self.points) > 1:  # Need at least 2 points to draw lines
-            points_list = [(int(x), int(y)) for x, y in self.points]  # Ensure integer coordinates
+        """Draw the trail in one blit; returns the screen rect it covers, or None"""
+        if len(self.points) < 2:  # Need at least 2 points to draw lines
+            return None
+        
+        xs = [int(x) for x, _ in self.points]
+        ys = [int(y) for _, y in self.points]
+        left, top = min(xs) - self.padding, min(ys) - self.padding
+        rect = pygame.Rect(left, top, max(xs) - left + self.padding + 1, max(ys) - top + self.padding + 1)
+        if not rect.colliderect(screen.get_rect()):
+            return None
+        
+        self._scratch(rect.width, rect.height)
+        area = pygame.Rect(0, 0, rect.width, rect.height)
+        self.glow.fill((0, 0, 0, 0), area)
+        self.composite.fill((0, 0, 0, 0), area)
+        
+        for i in range(len(self.colors)):
+            self.layer.fill((0, 0, 0, 0), area)
             
-            # Draw glow effect
-            glow_surface = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT), pygame.SRCALPHA)
+            # Trail points relative to the box, with slight randomness for energy effect
+            trail_points = [(x - left + random.uniform(-1, 1), y - top + random.uniform(-1, 1))
+                            for x, y in zip(xs, ys)]
             
-            for i, surface in enumerate(self.surfaces):
-                surface.fill((0, 0, 0, 0))
-                
-                # Add slight randomness to trail points for energy effect
-                trail_points = [(x + random.uniform(-1, 1), y + random.uniform(-1, 1)) 
-                              for x, y in points_list]
-                
-                # Draw main trail with glow
-                if len(trail_points) >= 2:  # Verify we have enough points
-                    pygame.draw.lines(surface, self.colors[i], False, trail_points, 6 + i*2)
-                    # Draw glow with reduced alpha
-                    glow_color = (*self.colors[i][:3], 30)  # Use RGB from color with low alpha
-                    pygame.draw.lines(glow_surface, glow_color, False, trail_points, 12 + i*4)
+            # Draw main trail with glow
+            pygame.draw.lines(self.layer, _premultiplied(self.colors[i]), False, trail_points, 6 + i*2)
+            # Draw glow with reduced alpha; it builds up, so each layer re-adds all glows so far
+            glow_color = (*self.colors[i][:3], 30)  # Use RGB from color with low alpha
+            pygame.draw.lines(self.glow, _premultiplied(glow_color), False, trail_points, 12 + i*4)
             
-                screen.blit(glow_surface, (0, 0))
-                screen.blit(surface, (0, 0))
\ No newline at end of file
+            self.composite.blit(self.glow, (0, 0), area, special_flags=pygame.BLEND_PREMULTIPLIED)
+            self.composite.blit(self.layer, (0, 0), area, special_flags=pygame.BLEND_PREMULTIPLIED)
+        
+        screen.blit(self.composite, rect.topleft, area, special_flags=pygame.BLEND_PREMULTIPLIED)
+        return rect.clip(screen.get_rect())
@@ -1,54 +1,149 @@
 import cv2
+import time
 import mediapipe as mp
 import numpy as np
 from collections import deque
+from roi_tracker import RoiHandTracker
+from latency_governor import LatencyGovernor, DEFAULT_LEVELS, fit_inference_size
+from hand_tracks import HandTrackManager, extract_landmarks, NUM_LANDMARKS, PALM
 
 class HandTracker:
-    def __init__(self):
+    def __init__(self, roi_tracking=False, latency_budget_ms=None, max_hands=1):
         self.mp_hands = mp.solutions.hands
+        self.max_hands = max_hands
         self.mp_draw = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=1,
-            min_detection_confidence=0.6,  # Reduced for better responsiveness
-            min_tracking_confidence=0.6,
-            model_complexity=0
-        )
+        self.model_complexity = 0
+        self.hands = self._create_hands()
+        self.inference_size = (320, 240)
+        # Crop around the last hand at full resolution; fall back to the downsized frame
+        self.roi_tracker = RoiHandTracker(self.hands, self._create_hands, full_frame_size=self.inference_size) if roi_tracking else None
         self.points_history = deque(maxlen=8)  # Reduced for faster response
         self.prev_point = None
         self.lost_tracking_frames = 0
         self.max_lost_frames = 5  # Reduced for quicker recovery
         
+        # With several hands, the blade follows the hand tracked longest
+        self.tracks = None
+        if max_hands > 1:
+            # Unsmoothed like the single-hand path: points_history smooths both
+            self.tracks = HandTrackManager(max_hands, smoothing=1.0)
+            self.hands_norm = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+            self.hands_handedness = np.zeros(max_hands, dtype=np.int8)
+        
         # Movement prediction
         self.velocity = (0, 0)
         self.smooth_factor = 0.5  # Increased for more direct movement
         self.prediction_decay = 0.8  # Slower velocity decay
         
-    def process_frame(self, frame):
-        # Resize frame for faster processing
-        small_frame = cv2.resize(frame, (320, 240))
-        rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        # Optional LandmarkRecorder that logs every processed frame
+        self.recorder = None
+        # Optional StageTimer charged with 'color' and 'inference'
+        self.stage_timer = None
+        
+        # Trade inference resolution, model size and frame rate for latency,
+        # starting from the fixed settings above
+        self.governor = None
+        self.last_result = None
+        self.result_reused = False
+        # Camera frames covered by the next fresh sample, for scaling velocity
+        self.sample_frames = 1
+        if latency_budget_ms:
+            level = DEFAULT_LEVELS.index({'inference_size': self.inference_size,
+                                          'model_complexity': self.model_complexity,
+                                          'frame_skip': 0})
+            self.governor = LatencyGovernor(latency_budget_ms, level=level, on_change=self.configure,
+                                            name="HandTracker governor")
+        
+    def _create_hands(self):
+        return self.mp_hands.Hands(
+            max_num_hands=self.max_hands,
+            min_detection_confidence=0.6,  # Reduced for better responsiveness
+            min_tracking_confidence=0.6,
+            model_complexity=self.model_complexity
+        )
+    
+    def configure(self, settings):
+        """Apply a LatencyGovernor level (inference_size, model_complexity)"""
+        self.inference_size = settings['inference_size']
+        if settings['model_complexity'] != self.model_complexity:
+            self.model_complexity = settings['model_complexity']
+            self.hands.close()
+            self.hands = self._create_hands()
+        if self.roi_tracker:
+            self.roi_tracker.set_hands(self.hands)
+            self.roi_tracker.full_frame_size = self.inference_size
+            self.roi_tracker.reset()
+    
+    def process_frame(self, frame, timestamp=None):
+        """Detect hands in a BGR frame; timestamp is its capture time, for the recorder"""
+        # Frames dropped by the governor reuse the last (normalized) result
+        self.result_reused = (self.governor is not None and self.last_result is not None
+                              and not self.governor.should_process())
+        if self.result_reused:
+            return self.last_result
+        
+        start = time.perf_counter()
+        self.last_result = self._detect(frame)
+        if self.governor:
+            self.governor.record(time.perf_counter() - start)
         
-        # Scale factor for converting coordinates back to original size
+        results = self.last_result[0]
+        if self.recorder:
+            self.recorder.record_results(results.multi_hand_landmarks, results.multi_handedness, timestamp)
+        if self.tracks:
+            count = extract_landmarks(results.multi_hand_landmarks, results.multi_handedness,
+                                      self.hands_norm, self.hands_handedness)
+            self.tracks.update(self.hands_norm[:count], self.hands_handedness[:count], time.perf_counter())
+        return self.last_result
+    
+    def get_tracked_hands(self):
+        """(ids, handedness, landmarks) of the tracked hands, oldest first, with (K, 21, 3) normalized landmarks"""
+        return self.tracks.stacked()
+    
+    def _detect(self, frame):
         height, width = frame.shape[:2]
-        scale_x = width / 320
-        scale_y = height / 240
+        timer = self.stage_timer
+        if self.roi_tracker:
+            # Landmarks come back in full-frame normalized coordinates
+            results = self.roi_tracker.process(frame)
+            # Cropping and colour conversion are not split out on this path
+            if timer:
+                timer.mark('inference')
+            return results, (1.0, 1.0)
+        
+        if self.inference_size is None:
+            # Full-resolution inference
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            scale_x = scale_y = 1.0
+        else:
+            # Resize frame for faster processing, keeping its aspect ratio
+            small_size = fit_inference_size(frame, self.inference_size)
+            small_frame = cv2.resize(frame, small_size)
+            rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+            
+            # Scale factor for converting coordinates back to original size
+            scale_x = width / small_size[0]
+            scale_y = height / small_size[1]
+        if timer:
+            timer.mark('color')
+        
+        results = self.hands.process(rgb_frame)
+        if timer:
+            timer.mark('inference')
         
         return results, (scale_x, scale_y)
     
-    def draw_tracking_info(self, frame, hand_pos, velocity):
-        # Create a copy of the frame to avoid modifying the original
-        overlay = frame.copy()
-        
-        # Add semi-transparent overlay for better visibility
-        cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+    def draw_tracking_info(self, frame, hand_pos, velocity, scale=1.0):
+        """Draw the tracking overlay in place; scale sizes it for frames smaller than the camera's"""
+        def px(value):
+            return max(1, int(round(value * scale)))
         
         # Draw tracking boundary
-        margin = 50
+        margin = px(50)
         cv2.rectangle(frame, 
                      (margin, margin), 
                      (frame.shape[1]-margin, frame.shape[0]-margin), 
-                     (0, 255, 0), 2)
+                     (0, 255, 0), px(2))
         
         if hand_pos is not None and hand_pos[0] is not None and hand_pos[1] is not None:
             x, y = int(hand_pos[0] * frame.shape[1]), int(hand_pos[1] * frame.shape[0])
@@ -56,20 +151,20 @@ class HandTracker:
             # Draw hand position with dynamic size based on velocity
             if isinstance(velocity, tuple) and len(velocity) == 2:
                 speed = np.sqrt(velocity[0]**2 + velocity[1]**2) * 1000
-                radius = int(10 + min(speed * 0.1, 10))  # Dynamic circle size
+                radius = px(10 + min(speed * 0.1, 10))  # Dynamic circle size
                 
                 # Draw outer glow
-                cv2.circle(frame, (x, y), radius + 4, (255, 255, 255), 2)
+                cv2.circle(frame, (x, y), radius + px(4), (255, 255, 255), px(2))
                 # Draw inner circle
                 cv2.circle(frame, (x, y), radius, (0, 255, 0), -1)
                 
                 # Draw movement vector
                 if abs(velocity[0]) > 0.001 or abs(velocity[1]) > 0.001:
-                    end_x = x + int(velocity[0] * 100)  # Increased vector length
-                    end_y = y + int(velocity[1] * 100)
+                    end_x = x + int(velocity[0] * 100 * scale)  # Increased vector length
+                    end_y = y + int(velocity[1] * 100 * scale)
                     # Draw arrow with glow effect
-                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (255, 255, 255), 4)
-                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (0, 255, 0), 2)
+                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (255, 255, 255), px(4))
+                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (0, 255, 0), px(2))
             
             # Draw tracking area guides
             guide_color = (0, 255, 0)
@@ -79,27 +174,46 @@ class HandTracker:
             # Draw "No Hand Detected" message
             text = "No Hand Detected"
             font = cv2.FONT_HERSHEY_SIMPLEX
-            text_size = cv2.getTextSize(text, font, 1, 2)[0]
+            text_size = cv2.getTextSize(text, font, scale, px(2))[0]
             text_x = (frame.shape[1] - text_size[0]) // 2
             text_y = frame.shape[0] // 2
             
             # Draw text with glow effect
-            cv2.putText(frame, text, (text_x+2, text_y+2), font, 1, (0, 0, 0), 3)
-            cv2.putText(frame, text, (text_x, text_y), font, 1, (0, 0, 255), 2)
+            cv2.putText(frame, text, (text_x+px(2), text_y+px(2)), font, scale, (0, 0, 0), px(3))
+            cv2.putText(frame, text, (text_x, text_y), font, scale, (0, 0, 255), px(2))
         
         return frame
     
-    def get_hand_position(self, frame):
-        results, scale = self.process_frame(frame)
+    def get_hand_position(self, frame, timestamp=None):
+        results, scale = self.process_frame(frame, timestamp)
+        
+        # A reused result is not a new sample: feeding it to the history would
+        # add a duplicate point and a zero-speed step
+        if self.result_reused:
+            self.sample_frames += 1
+            if self.prev_point is None:
+                return None, None, 0, (0, 0)
+            velocity = 0 if self.lost_tracking_frames else np.sqrt(self.velocity[0]**2 + self.velocity[1]**2) * 1000
+            return self.prev_point[0], self.prev_point[1], velocity, self.velocity
+        frames = self.sample_frames
+        self.sample_frames = 1
         
-        if results.multi_hand_landmarks:
+        if self.tracks:
+            ids, _, landmarks = self.tracks.stacked()
+            hand_found = len(ids) > 0
+        else:
+            hand_found = bool(results.multi_hand_landmarks)
+        
+        if hand_found:
             self.lost_tracking_frames = 0
-            hand_landmarks = results.multi_hand_landmarks[0]
             
             # Use palm center for more stable tracking
-            palm_points = [0, 5, 9, 13, 17]  # Wrist and finger base points
-            x = sum(hand_landmarks.landmark[i].x for i in palm_points) / len(palm_points)
-            y = sum(hand_landmarks.landmark[i].y for i in palm_points) / len(palm_points)
+            if self.tracks:
+                x, y = (float(v) for v in landmarks[0, PALM, :2].mean(axis=0))
+            else:
+                hand_landmarks = results.multi_hand_landmarks[0]
+                x = sum(hand_landmarks.landmark[i].x for i in PALM) / len(PALM)
+                y = sum(hand_landmarks.landmark[i].y for i in PALM) / len(PALM)
             
             # Store point in history
             self.points_history.append((x, y))
@@ -117,8 +231,9 @@ class HandTracker:
             
             # Calculate velocity with smoothing
             if self.prev_point:
-                dx = (current_point[0] - self.prev_point[0]) * 1.5  # Increased movement range
-                dy = (current_point[1] - self.prev_point[1]) * 1.5
+                # Per camera frame, also when the governor skipped frames in between
+                dx = (current_point[0] - self.prev_point[0]) * 1.5 / frames  # Increased movement range
+                dy = (current_point[1] - self.prev_point[1]) * 1.5 / frames
                 
                 # Smooth velocity
                 self.velocity = (
@@ -151,4 +266,6 @@ class HandTracker:
         return None, None, 0, (0, 0)
     
     def __del__(self):
-        self.hands.close()
\ No newline at end of file
+        self.hands.close()
+        if self.roi_tracker:
+            self.roi_tracker.close()
\ No newline at end of file
@@ -0,0 +1,166 @@
+import os
+import struct
+import time
+import numpy as np
+
+# Landmark log layout: a 64 byte header followed by fixed-size records.
+# Records are only ever appended, so a log cut short by a crash is still
+# readable up to the last complete record.
+MAGIC = b'LMKLOG01'
+HEADER_SIZE = 64
+HEADER_FORMAT = '<8sIII'
+NUM_LANDMARKS = 21
+
+# Handedness codes
+HAND_UNKNOWN = -1
+HAND_LEFT = 0
+HAND_RIGHT = 1
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),        # time.perf_counter() seconds, the capture clock
+    ('frame_index', '<u4'),
+    ('hand_present', 'u1'),
+    ('handedness', 'i1'),
+    ('confidence', '<f4'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),  # normalized x, y, z
+    ('reserved', 'u1', (2,))
+])
+
+def _handedness_code(label):
+    if label == 'Left':
+        return HAND_LEFT
+    if label == 'Right':
+        return HAND_RIGHT
+    return HAND_UNKNOWN
+
+class LandmarkRecorder:
+    """Appends one record per processed frame to a landmark log"""
+
+    def __init__(self, path, flush_every=30):
+        self.path = path
+        self.flush_every = flush_every
+        self.frame_index = 0
+        self.record = np.zeros(1, dtype=RECORD_DTYPE)
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE
+        if new_file:
+            self.file = open(path, 'wb')
+            header = struct.pack(HEADER_FORMAT, MAGIC, HEADER_SIZE, RECORD_DTYPE.itemsize, NUM_LANDMARKS)
+            self.file.write(header.ljust(HEADER_SIZE, b'\0'))
+        else:
+            # Continue an existing log, dropping any partial record left by a crash
+            header_size = _read_header(path)
+            self.frame_index = (os.path.getsize(path) - header_size) // RECORD_DTYPE.itemsize
+            self.file = open(path, 'r+b')
+            self.file.truncate(header_size + self.frame_index * RECORD_DTYPE.itemsize)
+            self.file.seek(0, os.SEEK_END)
+
+    def record_results(self, multi_hand_landmarks, multi_handedness=None, timestamp=None):
+        """Record the first hand of a MediaPipe result (or an empty frame); timestamp is the frame's capture time"""
+        if not multi_hand_landmarks:
+            self.write(None, timestamp=timestamp)
+            return
+
+        hand = multi_hand_landmarks[0]
+        landmarks = self.record['landmarks'][0]
+        for i, landmark in enumerate(hand.landmark):
+            landmarks[i] = (landmark.x, landmark.y, landmark.z)
+
+        handedness = HAND_UNKNOWN
+        confidence = 0.0
+        if multi_handedness:
+            classification = multi_handedness[0].classification[0]
+            handedness = _handedness_code(classification.label)
+            confidence = classification.score
+
+        self.write(landmarks, handedness, confidence, timestamp)
+
+    def write(self, landmarks, handedness=HAND_UNKNOWN, confidence=0.0, timestamp=None):
+        """Append a record from a (21, 3) normalized landmark array, or None for no hand"""
+        record = self.record[0]
+        record['timestamp'] = time.perf_counter() if timestamp is None else timestamp
+        record['frame_index'] = self.frame_index
+        if landmarks is None:
+            record['hand_present'] = 0
+            record['handedness'] = HAND_UNKNOWN
+            record['confidence'] = 0.0
+            record['landmarks'] = 0.0
+        else:
+            record['hand_present'] = 1
+            record['handedness'] = handedness
+            record['confidence'] = confidence
+            record['landmarks'] = landmarks
+
+        self.file.write(self.record.tobytes())
+        self.frame_index += 1
+        if self.frame_index % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Not a landmark log: {path}")
+    magic, header_size, record_size, num_landmarks = struct.unpack_from(HEADER_FORMAT, header)
+    if magic != MAGIC:
+        raise ValueError(f"Not a landmark log: {path}")
+    if record_size != RECORD_DTYPE.itemsize or num_landmarks != NUM_LANDMARKS:
+        raise ValueError(f"Unsupported landmark log layout in {path}")
+    return header_size
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view over a landmark log"""
+
+    def __init__(self, path):
+        self.path = path
+        header_size = _read_header(path)
+        # Ignore a trailing partial record from an interrupted session
+        count = (os.path.getsize(path) - header_size) // RECORD_DTYPE.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=header_size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    # Field views share memory with the file mapping; nothing is copied
+    @property
+    def timestamps(self):
+        return self.records['timestamp']
+
+    @property
+    def landmarks(self):
+        return self.records['landmarks']
+
+    @property
+    def handedness(self):
+        return self.records['handedness']
+
+    @property
+    def confidence(self):
+        return self.records['confidence']
+
+    @property
+    def hand_present(self):
+        return self.records['hand_present'].astype(bool)
+
+    def replay(self, realtime=False):
+        """Yield records in order, optionally paced by their original timestamps"""
+        if not len(self.records):
+            return
+        first = self.records[0]['timestamp']
+        start = time.perf_counter()
+        for record in self.records:
+            if realtime:
+                delay = (record['timestamp'] - first) - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            yield record
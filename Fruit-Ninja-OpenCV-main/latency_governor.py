@@ -0,0 +1,114 @@
+import time
+import numpy as np
+
+# Quality levels from most to least expensive. inference_size None means the
+# full camera frame, otherwise frames are scaled to its width at their own
+# aspect ratio; frame_skip N runs inference on one frame in N + 1.
+DEFAULT_LEVELS = [
+    {'inference_size': None, 'model_complexity': 1, 'frame_skip': 0},
+    {'inference_size': (480, 360), 'model_complexity': 1, 'frame_skip': 0},
+    {'inference_size': (480, 360), 'model_complexity': 0, 'frame_skip': 0},
+    {'inference_size': (320, 240), 'model_complexity': 0, 'frame_skip': 0},
+    {'inference_size': (320, 240), 'model_complexity': 0, 'frame_skip': 1},
+    {'inference_size': (256, 192), 'model_complexity': 0, 'frame_skip': 2},
+]
+
+def fit_inference_size(frame, size):
+    """(w, h) to resize frame to for an inference_size: its width, at the frame's aspect ratio"""
+    height, width = frame.shape[:2]
+    return size[0], max(1, round(size[0] * height / width))
+
+class LatencyGovernor:
+    """Steps tracker quality up or down to keep per-frame processing inside a time budget.
+
+    Processing times are collected in windows of `window` processed frames and
+    spread over the frame_skip + 1 camera frames each one covers, so the skip
+    levels lower the measured cost just as they lower the real one. A window whose
+    p90 is above budget * upper counts towards stepping down, one below
+    budget * lower towards stepping up; `patience` consecutive windows are
+    needed, and no change is made for `hold` windows after a step. Stepping up
+    into a level that was just abandoned doubles that hold, so a machine sitting
+    on the edge of a level does not oscillate.
+    """
+
+    def __init__(self, budget_ms=16.0, levels=None, level=0, window=30, upper=1.0, lower=0.6,
+                 patience=2, hold=3, on_change=None, name="governor"):
+        self.budget_ms = budget_ms
+        self.levels = levels or DEFAULT_LEVELS
+        self.level = max(0, min(level, len(self.levels) - 1))
+        self.window = window
+        self.upper = upper
+        self.lower = lower
+        self.patience = patience
+        self.hold = hold
+        self.on_change = on_change
+        self.name = name
+
+        self.samples = []
+        self.over_windows = 0
+        self.under_windows = 0
+        self.hold_windows = 0
+        self.backoff = {}       # level -> extra hold windows after it failed
+        self.frame_counter = 0
+        self.decisions = []
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def should_process(self):
+        """False on frames the current frame_skip setting drops"""
+        self.frame_counter += 1
+        skip = self.settings['frame_skip']
+        return skip == 0 or self.frame_counter % (skip + 1) == 0
+
+    def record(self, seconds):
+        # Cost per camera frame: the frames dropped since the last call were free
+        self.samples.append(seconds * 1000.0 / (self.settings['frame_skip'] + 1))
+        if len(self.samples) >= self.window:
+            self._evaluate(np.percentile(self.samples, 90))
+            self.samples.clear()
+
+    def _evaluate(self, p90_ms):
+        if self.hold_windows > 0:
+            self.hold_windows -= 1
+            return
+
+        if p90_ms > self.budget_ms * self.upper:
+            self.over_windows += 1
+            self.under_windows = 0
+        elif p90_ms < self.budget_ms * self.lower:
+            self.under_windows += 1
+            self.over_windows = 0
+        else:
+            self.over_windows = self.under_windows = 0
+
+        if self.over_windows >= self.patience and self.level < len(self.levels) - 1:
+            # Remember that the level we are leaving could not keep up
+            self.backoff[self.level] = min(self.backoff.get(self.level, self.hold) * 2, 64)
+            self._change(self.level + 1, p90_ms, "over budget")
+        elif self.under_windows >= self.patience and self.level > 0:
+            self._change(self.level - 1, p90_ms, "under budget")
+            self.hold_windows += self.backoff.get(self.level, 0)
+
+    def _change(self, level, p90_ms, reason):
+        previous = self.level
+        self.level = level
+        self.over_windows = self.under_windows = 0
+        self.hold_windows = self.hold
+
+        decision = {
+            'time': time.time(),
+            'from': previous,
+            'to': level,
+            'reason': reason,
+            'p90_ms': round(float(p90_ms), 2),
+            'budget_ms': self.budget_ms,
+            'settings': dict(self.settings)
+        }
+        self.decisions.append(decision)
+        print(f"[{self.name}] level {previous} -> {level} ({reason}: p90 {p90_ms:.1f} ms, "
+              f"budget {self.budget_ms:.1f} ms) settings={self.settings}")
+
+        if self.on_change:
+            self.on_change(self.settings)
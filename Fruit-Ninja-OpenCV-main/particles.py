@@ -0,0 +1,99 @@
+import numpy as np
+import pygame
+
+# Juice particles for every fruit in one structure of arrays. Particles are
+# written round-robin into fixed slots; all of them live the same number of
+# frames, so the next slot always holds the oldest particle and a full system
+# recycles oldest-first. Drawing blits pre-rendered circles, one per colour,
+# radius and alpha bucket, in a single blits() call.
+
+class ParticleSystem:
+    def __init__(self, capacity=2000, lifetime=60, gravity=0.3, fade=4, alpha_buckets=16):
+        self.capacity = capacity
+        self.lifetime = lifetime          # Frames
+        self.gravity = gravity
+        self.fade = fade                  # Alpha lost per frame, from 255
+        self.alpha_buckets = alpha_buckets
+
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)       # Frames left, 0 = free
+        self.radius = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int32)      # Index into palette
+        self.next = 0
+
+        self.palette = []
+        self.palette_index = {}
+        self.sprites = {}                 # (colour index, radius, alpha bucket) -> Surface
+        self.recycled = 0
+
+    def _color_index(self, color):
+        index = self.palette_index.get(color)
+        if index is None:
+            index = self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        return index
+
+    def emit(self, x, y, color, count=25, direction=0.0, spread=45.0, speed=(10.0, 20.0), size=(2.0, 6.0)):
+        """Spray count particles from (x, y) around direction (degrees)"""
+        count = min(count, self.capacity)
+        slots = (self.next + np.arange(count)) % self.capacity
+        self.next = (self.next + count) % self.capacity
+        self.recycled += int(np.count_nonzero(self.life[slots]))
+
+        angles = np.radians(direction + np.random.uniform(-spread, spread, count))
+        speeds = np.random.uniform(speed[0], speed[1], count)
+        self.pos[slots] = x, y
+        self.vel[slots, 0] = speeds * np.cos(angles)
+        self.vel[slots, 1] = speeds * np.sin(angles)
+        self.life[slots] = self.lifetime
+        self.radius[slots] = np.random.uniform(size[0], size[1], count).astype(np.int32)
+        self.color[slots] = self._color_index(color)
+
+    def update(self):
+        alive = self.life > 0
+        self.pos[alive] += self.vel[alive]
+        self.vel[alive, 1] += self.gravity
+        self.life[alive] -= 1
+
+    def _sprite(self, color, radius, bucket):
+        key = (color, radius, bucket)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            alpha = int(255 * (bucket + 1) / self.alpha_buckets)
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*self.palette[color], alpha), (radius, radius), radius)
+            self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, screen):
+        alive = np.flatnonzero(self.life > 0)
+        if not len(alive):
+            return
+        alpha = np.maximum(255 - self.fade * (self.lifetime - self.life[alive]), 0)
+        buckets = np.minimum(alpha * self.alpha_buckets // 256, self.alpha_buckets - 1)
+        radius = self.radius[alive]
+        corners = (self.pos[alive] - radius[:, None]).astype(np.int32)
+        colors = self.color[alive]
+
+        sprite = self._sprite
+        screen.blits([
+            (sprite(c, r, b), (x, y))
+            for c, r, b, (x, y) in zip(colors.tolist(), radius.tolist(), buckets.tolist(), corners.tolist())
+            if r > 0
+        ], doreturn=False)
+
+    def clear(self):
+        self.life[:] = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life))
+
+_system = None
+
+def get_particle_system():
+    """The ParticleSystem shared by all fruits"""
+    global _system
+    if _system is None:
+        _system = ParticleSystem()
+    return _system
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+import pygame
+
+# pygame.transform.rotate is one of the most expensive calls in a frame.
+# Sprites are rotated to angles quantized to `step` degrees the first time
+# each angle is drawn and reused from then on; least recently used rotations
+# are evicted once the cache holds max_bytes of pixels. Entries are keyed by
+# the caller's name for the sprite plus its size, so registries at different
+# sprite sizes never get each other's rotations.
+#
+# Every angle of every 80x80 fruit, half and the katana takes about 66 MiB.
+# The 64 MiB default stays just under that: with 200 fruits in flight
+# draw_benchmark evicts and re-rotates a few hundred rarely drawn angles
+# (about 3% of lookups), and a normal game never fills it. Raise max_bytes
+# (--rotation-cache-mib in the game and draw_benchmark) to trade memory for
+# those misses.
+
+class RotationCache:
+    def __init__(self, step=3, max_bytes=64 * 1024 * 1024):
+        self.step = step
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # (key, sprite size, quantized angle) -> rotated surface
+        self.bytes = 0
+        self.enabled = True            # False rotates every call, for comparisons
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize(self, angle):
+        return int(round(angle / self.step)) % int(round(360 / self.step))
+
+    def get(self, key, surface, angle):
+        """surface (known to the cache as key) rotated by angle, quantized to the cache step"""
+        if not self.enabled:
+            return pygame.transform.rotate(surface, angle)
+
+        step = self.quantize(angle)
+        entry = (key, surface.get_size(), step)
+        rotated = self.entries.get(entry)
+        if rotated is not None:
+            self.entries.move_to_end(entry)
+            self.hits += 1
+            return rotated
+
+        self.misses += 1
+        rotated = pygame.transform.rotate(surface, step * self.step)
+        self.entries[entry] = rotated
+        self.bytes += self._size(rotated)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= self._size(evicted)
+            self.evictions += 1
+        return rotated
+
+    def blit(self, screen, key, surface, angle, center):
+        """Blit the rotated sprite centred on center; returns the blitted rect"""
+        rotated = self.get(key, surface, angle)
+        return screen.blit(rotated, rotated.get_rect(center=center))
+
+    def _size(self, surface):
+        width, height = surface.get_size()
+        return width * height * surface.get_bytesize()
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'mib': self.bytes / (1024 * 1024),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions
+        }
+
+_cache = None
+
+def get_rotation_cache():
+    """The RotationCache shared by fruits, fruit halves and the katana"""
+    global _cache
+    if _cache is None:
+        _cache = RotationCache()
+    return _cache
@@ -0,0 +1,116 @@
+import threading
+import time
+import pygame
+
+# Fruit sprites are decoded, scaled and converted once per sprite size and
+# shared by every Fruit, so spawning a fruit never touches the disk.
+
+FRUIT_IMAGES = {
+    'apple': 'fruits/apple.png',
+    'orange': 'fruits/orange.png',
+    'banana': 'fruits/banana.png',
+    'watermelon': 'fruits/watermelon.png',
+    'pear': 'fruits/pear.png'
+}
+
+# Fruit juice colors, also used for placeholder sprites
+FRUIT_COLORS = {
+    'apple': (255, 50, 50),
+    'orange': (255, 165, 0),
+    'banana': (255, 255, 0),
+    'watermelon': (255, 50, 100),
+    'pear': (170, 255, 50)
+}
+
+def _placeholder(name, size):
+    width, height = size
+    radius = min(width, height) // 2
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    color = FRUIT_COLORS.get(name, (255, 0, 0))
+    pygame.draw.circle(surface, color, (width // 2, height // 2), radius)
+    # Add shine effect
+    highlight = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.circle(highlight, (255, 255, 255, 50), (width * 3 // 8, height * 3 // 8), radius // 2)
+    surface.blit(highlight, (0, 0))
+    return surface
+
+class SpriteRegistry:
+    """Fruit sprites at one size, loaded once; preload() does it on a background thread"""
+
+    def __init__(self, size=(80, 80)):
+        self.size = size
+        self.images = {}
+        self.halves = {}      # name -> (left, right) halves for the slice animation
+        self.load_times = {}  # Milliseconds per image: decode, scale and convert
+        self.total_ms = None
+        self.thread = None
+        self.loaded = threading.Event()
+        self.lock = threading.Lock()
+
+    def _load_image(self, name, path):
+        try:
+            image = pygame.transform.scale(pygame.image.load(path), self.size)
+        except Exception as e:
+            print(f"Error loading {path}: {e}, using a placeholder")
+            image = _placeholder(name, self.size)
+        # Converting needs a display mode; without one the sprite is used as is
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        return image
+
+    def _split(self, image):
+        width, height = image.get_size()
+        left = pygame.Surface((width // 2, height), pygame.SRCALPHA)
+        left.blit(image, (0, 0))
+        right = pygame.Surface((width // 2, height), pygame.SRCALPHA)
+        right.blit(image, (-(width // 2), 0))
+        if pygame.display.get_surface() is not None:
+            left, right = left.convert_alpha(), right.convert_alpha()
+        return left, right
+
+    def load(self):
+        with self.lock:
+            if self.loaded.is_set():
+                return self.images
+            start = time.perf_counter()
+            for name, path in FRUIT_IMAGES.items():
+                image_start = time.perf_counter()
+                self.images[name] = self._load_image(name, path)
+                self.halves[name] = self._split(self.images[name])
+                self.load_times[name] = (time.perf_counter() - image_start) * 1000.0
+            self.total_ms = (time.perf_counter() - start) * 1000.0
+            self.loaded.set()
+            return self.images
+
+    def preload(self):
+        """Start loading on a background thread; get() waits for it"""
+        if self.thread is None and not self.loaded.is_set():
+            self.thread = threading.Thread(target=self.load, name="SpritePreload", daemon=True)
+            self.thread.start()
+        return self
+
+    def get(self):
+        if not self.loaded.is_set():
+            # Blocks on the preload thread's lock if it is still running
+            self.load()
+        return self.images
+
+    def get_halves(self):
+        self.get()
+        return self.halves
+
+    def format_report(self):
+        if not self.loaded.is_set():
+            return "Sprites: not loaded"
+        times = ", ".join(f"{name} {ms:.1f}" for name, ms in self.load_times.items())
+        mode = "background" if self.thread else "foreground"
+        return (f"Sprites {self.size[0]}x{self.size[1]}: {len(self.images)} loaded in "
+                f"{self.total_ms:.1f} ms ({mode}; {times} ms)")
+
+_registries = {}
+
+def get_registry(size=(80, 80)):
+    """The shared SpriteRegistry for a sprite size"""
+    if size not in _registries:
+        _registries[size] = SpriteRegistry(size)
+    return _registries[size]
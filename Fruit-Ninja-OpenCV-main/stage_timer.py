@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+import cv2
+import numpy as np
+
+# Pipeline stages in display order; apps may record any subset
+STAGES = ('capture', 'color', 'inference', 'gesture', 'output', 'update', 'render')
+
+class StageTimer:
+    """Per-stage frame timings kept in fixed-size ring buffers.
+
+    A frame is timed with begin(), then mark(stage) after each stage, which
+    charges the time since the previous mark to that stage. add(stage,
+    seconds) records a duration measured elsewhere. A stage marked several
+    times in one frame adds up, and end_frame() stores one sample per stage
+    plus the 'total', so the percentiles are per-frame stage costs; with an
+    export path it also appends the frame as one JSON line. Frames are
+    thread-local, so a worker thread and the UI thread never charge stages
+    to each other's frames; samples recorded on a thread with no open frame
+    are stored as they come.
+    """
+
+    def __init__(self, capacity=600, export_path=None, hud_interval=0.5):
+        self.capacity = capacity
+        self.buffers = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+        self.frame_index = 0
+        self.export = open(export_path, 'a') if export_path else None
+
+        # The HUD text is rebuilt at most every hud_interval seconds
+        self.hud_interval = hud_interval
+        self.hud_time = 0.0
+        self.hud_cache = []
+
+    def begin(self):
+        self.local.frame = {}
+        self.local.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        last = getattr(self.local, 'last', None)
+        if last is not None:
+            self.add(stage, now - last)
+        self.local.last = now
+
+    def add(self, stage, seconds):
+        frame = getattr(self.local, 'frame', None)
+        if frame is not None:
+            frame[stage] = frame.get(stage, 0.0) + seconds
+            return
+        with self.lock:
+            self._store(stage, seconds)
+
+    def _store(self, stage, seconds):
+        buffer = self.buffers.get(stage)
+        if buffer is None:
+            buffer = self.buffers[stage] = np.zeros(self.capacity)
+            self.counts[stage] = 0
+        buffer[self.counts[stage] % self.capacity] = seconds
+        self.counts[stage] += 1
+
+    def end_frame(self):
+        frame = getattr(self.local, 'frame', None)
+        self.local.frame = None
+        if not frame:
+            return
+        total = sum(frame.values())
+        with self.lock:
+            for stage, seconds in frame.items():
+                self._store(stage, seconds)
+            self._store('total', total)
+            if self.export:
+                line = {'frame': self.frame_index, 'time': time.time()}
+                for stage, seconds in frame.items():
+                    line[f'{stage}_ms'] = round(seconds * 1000.0, 3)
+                line['total_ms'] = round(total * 1000.0, 3)
+                self.export.write(json.dumps(line) + '\n')
+            self.frame_index += 1
+
+    def _samples(self, stage):
+        count = self.counts.get(stage, 0)
+        return self.buffers[stage][:min(count, self.capacity)] if count else None
+
+    def percentiles(self, stage, q=(50, 95, 99)):
+        """Milliseconds at the given percentiles over the ring buffer, or None"""
+        with self.lock:
+            samples = self._samples(stage)
+            if samples is None:
+                return None
+            return [float(v) for v in np.percentile(samples, q) * 1000.0]
+
+    def histogram(self, stage, bins=20):
+        """(counts, edges in ms) over the ring buffer, or None"""
+        with self.lock:
+            samples = self._samples(stage)
+            if samples is None:
+                return None
+            return np.histogram(samples * 1000.0, bins=bins)
+
+    def summary(self):
+        with self.lock:
+            names = list(self.buffers)
+        order = [s for s in STAGES if s in names]
+        order += [s for s in names if s not in order and s != 'total']
+        if 'total' in names:
+            order.append('total')
+
+        stats = {}
+        for stage in order:
+            p50, p95, p99 = self.percentiles(stage)
+            stats[stage] = {'count': self.counts.get(stage, 0), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99}
+        return stats
+
+    def format_summary(self):
+        lines = [f"{'stage':<10} {'p50':>7} {'p95':>7} {'p99':>7}  (ms)"]
+        for stage, s in self.summary().items():
+            lines.append(f"{stage:<10} {s['p50_ms']:7.2f} {s['p95_ms']:7.2f} {s['p99_ms']:7.2f}")
+        return '\n'.join(lines)
+
+    def hud_lines(self):
+        """Short per-stage lines for an on-screen overlay"""
+        now = time.perf_counter()
+        if now - self.hud_time >= self.hud_interval:
+            self.hud_time = now
+            self.hud_cache = [
+                f"{stage:<9} {s['p50_ms']:5.1f} / {s['p95_ms']:5.1f} / {s['p99_ms']:5.1f} ms"
+                for stage, s in self.summary().items()
+            ]
+        return self.hud_cache
+
+    def draw_hud(self, img, origin=(10, 20), line_height=16):
+        """Draw hud_lines onto a BGR frame"""
+        x, y = origin
+        for line in self.hud_lines():
+            cv2.putText(img, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 0, 0), 3)
+            cv2.putText(img, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 255), 1)
+            y += line_height
+        return img
+
+    def close(self):
+        with self.lock:
+            if self.export:
+                self.export.close()
+                self.export = None
@@ -1,25 +1,100 @@
 import cv2
+import time
 import mediapipe as mp
 import numpy as np
+from roi_tracker import RoiHandTracker
+from latency_governor import LatencyGovernor, fit_inference_size
+from hand_tracks import HandTrackManager, extract_landmarks, NUM_LANDMARKS
 
 class HandTracker:
-    def __init__(self):
+    def __init__(self, roi_tracking=False, latency_budget_ms=None, max_hands=1):
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        self.max_hands = max_hands
+        self.model_complexity = 1
+        self.inference_size = None  # (w, h) to downscale frames to before inference
+        self.hands = self._create_hands()
+        self.mp_draw = mp.solutions.drawing_utils
+        self.landmark_positions = []
+        # Crop inference to the area around the last hand when enabled
+        self.roi_tracker = RoiHandTracker(self.hands, self._create_hands) if roi_tracking else None
+
+        # Optional StageTimer charged with 'color' and 'inference'
+        self.stage_timer = None
+
+        # With several hands, landmark_positions is ordered by track age, so
+        # the pointer stays on the hand seen first
+        self.tracks = None
+        if max_hands > 1:
+            self.tracks = HandTrackManager(max_hands)
+            self.hands_norm = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+            self.hands_handedness = np.zeros(max_hands, dtype=np.int8)
+
+        # Trade inference resolution, model size and frame rate for latency
+        self.governor = None
+        self.results = None
+        if latency_budget_ms:
+            self.governor = LatencyGovernor(latency_budget_ms, on_change=self.configure,
+                                            name="HandTracker governor")
+            self.configure(self.governor.settings)
+
+    def _create_hands(self):
+        return self.mp_hands.Hands(
             static_image_mode=False,
-            max_num_hands=1,
+            max_num_hands=self.max_hands,
+            model_complexity=self.model_complexity,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
         )
-        self.mp_draw = mp.solutions.drawing_utils
-        self.landmark_positions = []
 
-    def process_frame(self, frame):
+    def configure(self, settings):
+        """Apply a LatencyGovernor level (inference_size, model_complexity)"""
+        self.inference_size = settings['inference_size']
+        if settings['model_complexity'] != self.model_complexity:
+            self.model_complexity = settings['model_complexity']
+            self.hands.close()
+            self.hands = self._create_hands()
+        if self.roi_tracker:
+            self.roi_tracker.set_hands(self.hands)
+            self.roi_tracker.full_frame_size = self.inference_size
+            self.roi_tracker.reset()
+
+    def _detect(self, frame):
+        timer = self.stage_timer
+        if self.roi_tracker:
+            # Landmarks come back in full-frame normalized coordinates
+            results = self.roi_tracker.process(frame)
+            # Cropping and colour conversion are not split out on this path
+            if timer:
+                timer.mark('inference')
+            return results
+
+        if self.inference_size and frame.shape[1] > self.inference_size[0]:
+            frame = cv2.resize(frame, fit_inference_size(frame, self.inference_size))
+
         # Convert BGR to RGB
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if timer:
+            timer.mark('color')
         
         # Process the frame and detect hands
         results = self.hands.process(rgb_frame)
+        if timer:
+            timer.mark('inference')
+        return results
+
+    def process_frame(self, frame):
+        # Frames dropped by the governor reuse the last (normalized) result
+        skip = self.governor and self.results is not None and not self.governor.should_process()
+        if not skip:
+            start = time.perf_counter()
+            self.results = self._detect(frame)
+            if self.governor:
+                self.governor.record(time.perf_counter() - start)
+            if self.tracks:
+                count = extract_landmarks(self.results.multi_hand_landmarks, self.results.multi_handedness,
+                                          self.hands_norm, self.hands_handedness)
+                self.tracks.update(self.hands_norm[:count], self.hands_handedness[:count], time.perf_counter())
+        results = self.results
         
         # Clear previous positions
         self.landmark_positions = []
@@ -41,8 +116,19 @@ class HandTracker:
                     positions.append((x, y))
                 self.landmark_positions.append(positions)
 
+        if self.tracks:
+            height, width = frame.shape[:2]
+            _, _, landmarks = self.tracks.stacked()
+            self.landmark_positions = [
+                [(int(x * width), int(y * height)) for x, y, _ in hand] for hand in landmarks
+            ]
+
         return frame, self.landmark_positions
 
+    def get_tracked_hands(self):
+        """(ids, handedness, landmarks) of the tracked hands, oldest first, with (K, 21, 3) normalized landmarks"""
+        return self.tracks.stacked()
+
     def get_pointer_position(self):
         """Returns the position of the index finger tip (landmark 8)"""
         if self.landmark_positions and len(self.landmark_positions[0]) > 8:
@@ -60,4 +146,6 @@ class HandTracker:
 
     def release(self):
         """Release resources"""
-        self.hands.close()
\ No newline at end of file
+        self.hands.close()
+        if self.roi_tracker:
+            self.roi_tracker.close()
\ No newline at end of file
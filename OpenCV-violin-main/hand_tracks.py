@@ -0,0 +1,149 @@
+import itertools
+import numpy as np
+
+# Stable identities for the hands MediaPipe returns. MediaPipe's hand order
+# changes from frame to frame, so detections are matched to existing tracks by
+# palm position, with a penalty for a handedness mismatch. Handedness codes
+# follow landmark_log: negative means unknown, otherwise 0 left / 1 right.
+
+NUM_LANDMARKS = 21
+PALM = [0, 5, 9, 13, 17]  # Wrist and finger bases
+
+def extract_landmarks(multi_hand_landmarks, multi_handedness, out_landmarks, out_handedness):
+    """Copy MediaPipe results into preallocated (H, 21, 3) / (H,) arrays; returns the hand count"""
+    count = min(len(multi_hand_landmarks or ()), len(out_landmarks))
+    for h in range(count):
+        target = out_landmarks[h]
+        for i, landmark in enumerate(multi_hand_landmarks[h].landmark):
+            target[i, 0] = landmark.x
+            target[i, 1] = landmark.y
+            target[i, 2] = landmark.z
+        out_handedness[h] = -1
+        if multi_handedness and h < len(multi_handedness):
+            out_handedness[h] = 0 if multi_handedness[h].classification[0].label == 'Left' else 1
+    return count
+
+class HandTrack:
+    def __init__(self, track_id, landmarks, handedness, timestamp):
+        self.id = track_id
+        self.handedness = handedness
+        # Per-hand smoothing state
+        self.landmarks = landmarks.astype(np.float32)
+        self.center = self.landmarks[PALM, :2].mean(axis=0)
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.missed = 0
+        self.hits = 1
+
+    def update(self, landmarks, handedness, timestamp, smoothing, reference_rate):
+        dt = max(timestamp - self.last_seen, 0.0)
+        if smoothing >= 1.0 or self.missed:
+            # No smoothing, or the hand was gone: start from the new detection
+            self.landmarks[:] = landmarks
+        else:
+            alpha = 1.0 - (1.0 - smoothing) ** (dt * reference_rate)
+            self.landmarks += (landmarks - self.landmarks) * alpha
+        self.center = self.landmarks[PALM, :2].mean(axis=0)
+        if handedness >= 0:
+            self.handedness = handedness
+        self.last_seen = timestamp
+        self.missed = 0
+        self.hits += 1
+
+class HandTrackManager:
+    """Matches per-frame hand detections to tracks with stable IDs.
+
+    Costs are palm-centre distances in normalized coordinates plus
+    handedness_cost when both handedness labels are known and differ; pairs
+    costing more than max_distance are never matched. Tracks survive
+    max_missed frames without a detection. smoothing is the per-frame weight
+    of a new detection at reference_rate; the default trims landmark jitter
+    for about one frame of lag, and 1.0 disables smoothing.
+    """
+
+    def __init__(self, max_hands=2, max_distance=0.25, handedness_cost=0.15, max_missed=5,
+                 smoothing=0.6, reference_rate=30.0):
+        self.max_hands = max_hands
+        self.max_distance = max_distance
+        self.handedness_cost = handedness_cost
+        self.max_missed = max_missed
+        self.smoothing = smoothing
+        self.reference_rate = reference_rate
+        self.tracks = []
+        self.next_id = 0
+
+        # Stacked output buffers, reused every frame
+        self.ids = np.zeros(max_hands, dtype=np.int32)
+        self.handedness = np.zeros(max_hands, dtype=np.int8)
+        self.landmarks = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+
+    def reset(self):
+        self.tracks = []
+
+    def _cost(self, landmarks, handedness):
+        centers = landmarks[:, PALM, :2].mean(axis=1)
+        track_centers = np.array([t.center for t in self.tracks]).reshape(-1, 2)
+        track_hands = np.array([t.handedness for t in self.tracks])
+        cost = np.linalg.norm(track_centers[:, None, :] - centers[None, :, :], axis=2)
+        known = (track_hands[:, None] >= 0) & (handedness[None, :] >= 0)
+        cost += self.handedness_cost * (known & (track_hands[:, None] != handedness[None, :]))
+        return cost
+
+    def _assign(self, cost):
+        # At most a handful of hands, so trying every assignment is cheap and optimal
+        tracks, detections = cost.shape
+        best, best_pairs = np.inf, []
+        if tracks <= detections:
+            for columns in itertools.permutations(range(detections), tracks):
+                pairs = [(t, d) for t, d in enumerate(columns) if cost[t, d] <= self.max_distance]
+                total = sum(cost[t, d] for t, d in pairs) + self.max_distance * (tracks - len(pairs))
+                if total < best:
+                    best, best_pairs = total, pairs
+        else:
+            for rows in itertools.permutations(range(tracks), detections):
+                pairs = [(t, d) for d, t in enumerate(rows) if cost[t, d] <= self.max_distance]
+                total = sum(cost[t, d] for t, d in pairs) + self.max_distance * (detections - len(pairs))
+                if total < best:
+                    best, best_pairs = total, pairs
+        return best_pairs
+
+    def update(self, landmarks, handedness, timestamp):
+        """Feed (H, 21, 3) normalized landmarks and (H,) handedness codes; returns stacked()"""
+        landmarks = np.asarray(landmarks, dtype=np.float32)[:self.max_hands]
+        handedness = np.asarray(handedness)[:len(landmarks)]
+
+        matched_tracks, matched_detections = set(), set()
+        if self.tracks and len(landmarks):
+            for t, d in self._assign(self._cost(landmarks, handedness)):
+                self.tracks[t].update(landmarks[d], int(handedness[d]), timestamp,
+                                      self.smoothing, self.reference_rate)
+                matched_tracks.add(t)
+                matched_detections.add(d)
+
+        survivors = []
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+            if track.missed <= self.max_missed:
+                survivors.append(track)
+        self.tracks = survivors
+
+        for d in range(len(landmarks)):
+            if d not in matched_detections and len(self.tracks) < self.max_hands:
+                self.tracks.append(HandTrack(self.next_id, landmarks[d], int(handedness[d]), timestamp))
+                self.next_id += 1
+
+        return self.stacked()
+
+    def stacked(self):
+        """(ids, handedness, landmarks) of hands seen this frame, oldest track first.
+
+        The arrays are views of buffers that the next update overwrites.
+        """
+        visible = sorted((t for t in self.tracks if t.missed == 0), key=lambda t: t.id)
+        for k, track in enumerate(visible):
+            self.ids[k] = track.id
+            self.handedness[k] = track.handedness
+            self.landmarks[k] = track.landmarks
+        count = len(visible)
+        return self.ids[:count], self.handedness[:count], self.landmarks[:count]
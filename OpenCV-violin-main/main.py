@@ -1,26 +1,38 @@
+import argparse
 import cv2
 import pygame
 from hand_tracker import HandTracker
 from sound_engine import SoundEngine
 from visualizer import Visualizer
+from frame_source import open_frame_source
+from camera_config import configure_camera
+from stage_timer import StageTimer
 
-def main():
+def main(source=0, roi_tracking=False, latency_budget_ms=None, hud=False, stage_log=None,
+         negotiate_camera=False, max_hands=1):
     # Initialize components
-    cap = cv2.VideoCapture(0)
-    hand_tracker = HandTracker()
+    cap = open_frame_source(source)
+    hand_tracker = HandTracker(roi_tracking=roi_tracking, latency_budget_ms=latency_budget_ms,
+                               max_hands=max_hands)
+    # Per-stage frame timings, shown with H and optionally logged as JSON lines
+    timer = StageTimer(export_path=stage_log)
+    hand_tracker.stage_timer = timer
     sound_engine = SoundEngine()
     visualizer = Visualizer()
 
-    # Set camera resolution
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    # Set camera resolution, frame rate and driver buffering
+    configure_camera(cap, 640, 480, negotiate_mode=negotiate_camera)
 
     try:
         while True:
+            timer.begin()
+
             # Process events
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     raise KeyboardInterrupt
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                    hud = not hud
 
             # Read camera frame
             ret, frame = cap.read()
@@ -30,9 +42,11 @@ def main():
 
             # Mirror frame horizontally
             frame = cv2.flip(frame, 1)
+            timer.mark('capture')
 
             # Process hand tracking
             frame, hand_positions = hand_tracker.process_frame(frame)
+            timer.mark('gesture')
 
             # Get pointer position and convert to note
             pointer_pos = hand_tracker.get_pointer_position()
@@ -46,17 +60,26 @@ def main():
                 sound_engine.play_note(current_note, volume)
             else:
                 sound_engine.stop_current_note()
+            timer.mark('output')
+
+            if hud:
+                timer.draw_hud(frame)
 
             # Convert frame from BGR to RGB for pygame
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
             # Update visualization
             visualizer.update(frame, hand_positions, current_note)
+            timer.mark('render')
+            timer.end_frame()
 
     except KeyboardInterrupt:
         print("\nExiting...")
     finally:
         # Clean up resources
+        if timer.counts:
+            print(timer.format_summary())
+        timer.close()
         cap.release()
         hand_tracker.release()
         sound_engine.cleanup()
@@ -64,4 +87,21 @@ def main():
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Virtual Violin")
+    parser.add_argument('--source', default='0',
+                        help="camera index, video file, image directory/glob or 'synthetic'")
+    parser.add_argument('--roi', action='store_true',
+                        help="track the hand in a crop around its last position")
+    parser.add_argument('--latency-budget', type=float, metavar='MS',
+                        help="adapt inference resolution, model and frame skipping to this per-frame budget")
+    parser.add_argument('--max-hands', type=int, default=1,
+                        help="hands to track; the pointer follows the hand seen first")
+    parser.add_argument('--negotiate-camera', action='store_true',
+                        help="probe camera formats and frame rates and use the lowest-latency mode")
+    parser.add_argument('--hud', action='store_true',
+                        help="show per-stage latency percentiles (toggle with H)")
+    parser.add_argument('--stage-log', metavar='PATH',
+                        help="append per-frame stage timings to a JSON-lines file")
+    args = parser.parse_args()
+    main(args.source, args.roi, args.latency_budget, args.hud, args.stage_log, args.negotiate_camera,
+         args.max_hands)
\ No newline at end of file
@@ -1,22 +1,83 @@
+import argparse
+import threading
+import time
 import cv2
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 import keyboard
 from hand_detector import HandDetector
 from mouse_controller import MouseController
 from ui_theme import DarkTheme, GameStats
 from game_engine import GameEngine
+from capture_thread import CaptureThread
+from inference_worker import InferenceWorker, ProcessInferenceWorker
+from frame_source import open_frame_source
+from camera_config import configure_camera
+from landmark_log import LandmarkRecorder
+from pointer_filters import FILTERS, make_filter
+from cursor_predictor import LatencyPredictor
+from pointer_backends import make_backend
+from preview_renderer import PreviewRenderer
+from gesture_events import GestureEventEngine
+from stage_timer import StageTimer
 
 class VirtualMouse:
-    def __init__(self):
+    def __init__(self, source=0, worker_mode='thread', record_path=None, pointer_filter='ema',
+                 predict=False, output='pyautogui', preview_fps=15, roi_tracking=False,
+                 latency_budget_ms=None, hud=False, stage_log=None, camera_size=(640, 480),
+                 negotiate_camera=False, confirm_frames=2, max_hands=1, targets=3):
+        # Camera index, video/image-sequence path or 'synthetic'
+        self.source = source
+        # Requested camera resolution; negotiation also probes formats and rates
+        self.camera_size = camera_size
+        self.negotiate_camera = negotiate_camera
+        # Landmark log written while the mouse is running
+        self.record_path = record_path
+        # Name of the pointer_filters filter used for cursor smoothing
+        self.pointer_filter = pointer_filter
+        # Extrapolate the cursor forward by the measured pipeline latency
+        self.predict = predict
+        # Pointer output backend name, see pointer_backends
+        self.output = output
+        self.preview_fps = preview_fps
+        # Run inference on a crop around the last hand
+        self.roi_tracking = roi_tracking
+        # Per-frame inference budget for the detector's LatencyGovernor (None disables it)
+        self.latency_budget_ms = latency_budget_ms
+        # Hands tracked at once; with more than one, any hand can click while the first points
+        self.max_hands = max_hands
+        # Apples per round; hundreds or thousands turn the game into a pointer precision load test
+        self.targets = targets
+        # Per-stage timings: on-screen HUD and optional JSON-lines log
+        self.show_hud = hud
+        self.stage_log = stage_log
+        self.stage_timer = None
         self.cap = None
+        self.capture = None
+        self.worker = None
+        # 'thread' keeps MediaPipe in this process, 'process' sidesteps the GIL
+        self.worker_mode = worker_mode
         self.running = False
+        # Held by the worker while it handles a result, so stop_mouse can wait it out
+        self.result_lock = threading.Lock()
         self.hand_detector = None
         self.mouse_controller = None
+        # Frame-confirmed press/release events for the click gestures
+        self.gesture_engine = GestureEventEngine(press_frames=confirm_frames)
+        
+        # The camera, detector and pointer output are built once in the
+        # background and paused/resumed by start_mouse/stop_mouse
+        self.pipeline_ready = threading.Event()
+        self.prewarm_thread = None
+        self.prewarm_error = None
+        self.start_pending = False
+        self.start_time = None
+        self.first_move_pending = False
+        self.first_move_times = []
         
         # Setup UI
         self.setup_ui()
+        self.start_prewarm()
         
         # Setup keyboard shortcut for emergency exit
         keyboard.on_press_key('esc', self.emergency_exit)
@@ -45,10 +106,12 @@ class VirtualMouse:
             text=(
                 "Controls:\n"
                 "- Index finger: Move cursor\n"
-                "- Thumb up: Left click\n"
+                "- Thumb up: Left click (hold to drag)\n"
                 "- Last 2-3 fingers up: Right click\n"
                 "- Press 'Esc' for emergency exit\n"
-                "- Ctrl+S to toggle mouse control\n\n"
+                "- Ctrl+S to toggle mouse control\n"
+                "- Ctrl+P to show/hide camera preview\n"
+                "- Ctrl+H to show/hide latency HUD\n\n"
                 "Game Rules:\n"
                 "- Click all apples to complete round\n"
                 "- Faster completion = Higher score\n"
@@ -84,6 +147,7 @@ class VirtualMouse:
         
         self.video_label = ttk.Label(self.video_frame, style="Dark.TLabel")
         self.video_label.pack(fill=tk.BOTH, expand=True)
+        self.preview = PreviewRenderer(self.video_label, self.preview_fps, container=self.video_frame)
         
         # Right panel - Game area
         right_panel = ttk.Frame(main_container, style="Dark.TFrame")
@@ -112,133 +176,362 @@ class VirtualMouse:
         self.game_canvas.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
         # Initialize game engine
-        self.game_engine = GameEngine(self.game_canvas, self.game_stats)
+        self.game_engine = GameEngine(self.game_canvas, self.game_stats, apple_count=self.targets)
         
         # Bind keyboard shortcuts
         self.root.bind('<Control-s>', lambda e: self.toggle_mouse())
+        self.root.bind('<Control-p>', lambda e: self.toggle_preview())
+        self.root.bind('<Control-h>', lambda e: self.toggle_hud())
         self.root.bind('<Escape>', lambda e: self.emergency_exit())
         
     def emergency_exit(self, e=None):
         print("Emergency exit triggered")
         self.stop_mouse()
+        self.release_pipeline()
         self.root.quit()
         
-    def toggle_mouse(self):
-        if self.running:
-            self.stop_mouse()
-        else:
-            self.start_mouse()
-            
-    def start_mouse(self):
+    def start_prewarm(self):
+        self.pipeline_ready.clear()
+        self.prewarm_error = None
+        self.prewarm_thread = threading.Thread(target=self.prewarm, name="Prewarm", daemon=True)
+        self.prewarm_thread.start()
+        
+    def prewarm(self):
+        # Runs off the Tk thread: open the source, build the detector and run
+        # one inference so the first Ctrl+S does not wait on any of it
+        start = time.perf_counter()
         try:
-            self.cap = cv2.VideoCapture(0)
+            self.cap = open_frame_source(self.source)
             if not self.cap.isOpened():
-                raise Exception("Could not open webcam")
+                raise Exception("Could not open video source")
+            configure_camera(self.cap, *self.camera_size, negotiate_mode=self.negotiate_camera)
                 
-            self.hand_detector = HandDetector()
-            self.mouse_controller = MouseController()
+            # Camera I/O runs on its own thread so a slow read never blocks Tk
+            self.capture = CaptureThread(self.cap).start()
+            item = self.capture.read(timeout=5.0)
+            if item is None:
+                raise Exception("No frames from video source")
+            self.capture.pause()
+            first_frame = item[2]
             
-            self.running = True
-            self.toggle_btn.config(text="Stop (Ctrl+S)")
-            self.status_label.config(text="Status: Running")
-            self.game_engine.start()
-            self.process_video()
+            self.mouse_controller = MouseController(
+                pointer_filter=make_filter(self.pointer_filter),
+                predictor=LatencyPredictor() if self.predict else None,
+                backend=make_backend(self.output)
+            )
+            self.stage_timer = StageTimer(export_path=self.stage_log)
             
+            # Detection and pointer output run off the Tk thread
+            if self.worker_mode == 'process':
+                self.worker = ProcessInferenceWorker(
+                    self.capture, on_result=self.handle_result, record_path=self.record_path,
+                    detector_kwargs={'roi_tracking': self.roi_tracking,
+                                     'latency_budget_ms': self.latency_budget_ms,
+                                     'max_hands': self.max_hands},
+                    stage_timer=self.stage_timer
+                )
+                if not self.worker.prewarm(first_frame.shape):
+                    raise Exception("Detector process did not start")
+            else:
+                self.hand_detector = HandDetector(max_hands=self.max_hands, roi_tracking=self.roi_tracking,
+                                                 latency_budget_ms=self.latency_budget_ms)
+                self.hand_detector.find_hands(first_frame, draw=False)
+                if self.record_path:
+                    self.hand_detector.recorder = LandmarkRecorder(self.record_path)
+                self.worker = InferenceWorker(self.capture, self.hand_detector, on_result=self.handle_result,
+                                              stage_timer=self.stage_timer)
+            self.worker.start()
+            
+            print(f"Pipeline ready in {time.perf_counter() - start:.2f} s")
+            self.pipeline_ready.set()
         except Exception as e:
-            self.status_label.config(text=f"Error: {str(e)}")
+            print(f"Prewarm error: {e}")
+            self.release_pipeline()
+            self.prewarm_error = e
+        
+    def toggle_mouse(self):
+        if self.running or self.start_pending:
             self.stop_mouse()
+        else:
+            self.start_mouse()
+            
+    def start_mouse(self):
+        if self.prewarm_error is not None:
+            self.start_pending = False
+            self.status_label.config(text=f"Error: {str(self.prewarm_error)}")
+            # Try again in the background for the next Ctrl+S
+            self.start_prewarm()
+            return
+            
+        if not self.pipeline_ready.is_set():
+            # Still warming up; start as soon as the pipeline is ready
+            if not self.start_pending:
+                self.start_pending = True
+                self.status_label.config(text="Status: Warming up...")
+                self.root.after(50, self._poll_start)
+            return
+        self.start_pending = False
+        
+        if self.capture.error:
+            self.handle_capture_error()
+            return
+        
+        # Resume the warm pipeline; stale smoothing, gesture and ROI state is dropped
+        self.mouse_controller.reset()
+        self.gesture_engine.reset()
+        self.worker.reset()
+        self.start_time = time.perf_counter()
+        self.first_move_pending = True
+        self.running = True
+        self.capture.resume()
+        
+        self.toggle_btn.config(text="Stop (Ctrl+S)")
+        self.status_label.config(text="Status: Running")
+        self.game_engine.start()
+        self.process_video()
+        
+    def _poll_start(self):
+        if self.start_pending:
+            self.start_pending = False
+            self.start_mouse()
             
     def stop_mouse(self):
         self.running = False
+        self.start_pending = False
         self.toggle_btn.config(text="Start (Ctrl+S)")
         self.status_label.config(text="Status: Stopped")
         self.game_engine.stop()
         
+        # Never leave a button held down by a drag. Taking the lock waits for a
+        # result still in flight; later ones see running cleared and do nothing
+        with self.result_lock:
+            self.gesture_engine.reset()
+            if self.mouse_controller:
+                self.mouse_controller.release_all()
+            
+        # Pause only: the camera and detector stay warm for the next start
+        if self.capture:
+            self.capture.pause()
+            stats = self.capture.get_stats()
+            print(f"Capture stats: {stats['processed']} processed, {stats['dropped']} dropped")
+            
+        preview_stats = self.preview.get_stats()
+        if preview_stats['updates']:
+            print(f"Preview: {preview_stats['mean_ms']:.2f} ms mean, "
+                  f"{preview_stats['p95_ms']:.2f} ms p95 per update")
+            
+        if self.stage_timer and self.stage_timer.counts:
+            print(self.stage_timer.format_summary())
+            
+        metrics = self.get_pointer_metrics()
+        if metrics:
+            print(f"Pointer latency: {metrics['latency_ms']:.1f} ms, "
+                  f"prediction error: {metrics['prediction_error_px']:.1f} px")
+            
+        gesture_metrics = self.gesture_engine.get_metrics()
+        if gesture_metrics['events']:
+            print(f"Gesture events: {gesture_metrics['events']}, gesture-to-click latency "
+                  f"{gesture_metrics['gesture_latency_ms']:.0f} ms median, "
+                  f"{gesture_metrics['gesture_latency_p95_ms']:.0f} ms p95")
+            
+        game_metrics = self.game_engine.get_metrics()
+        if game_metrics['clicks']:
+            print(f"Targets: {game_metrics['hits']}/{game_metrics['clicks']} clicks hit "
+                  f"({game_metrics['hit_rate']:.0%}), median hit error {game_metrics['hit_error']:.2f} radii, "
+                  f"{game_metrics['hits_per_second']:.2f} hits/s")
+            
+    def handle_capture_error(self):
+        # The source stopped delivering frames: tear down, and rebuild on the next start
+        error = self.capture.error
+        self.stop_mouse()
+        self.release_pipeline()
+        self.prewarm_error = Exception(error)
+        self.status_label.config(text=f"Error: {error}")
+        
+    def release_pipeline(self):
+        # Full teardown, on exit or when prewarming failed
+        if self.prewarm_thread and self.prewarm_thread is not threading.current_thread():
+            self.prewarm_thread.join(5.0)
+        self.pipeline_ready.clear()
+        
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+            
+        if self.hand_detector:
+            if self.hand_detector.recorder:
+                self.hand_detector.recorder.close()
+                self.hand_detector.recorder = None
+            self.hand_detector.close()
+            self.hand_detector = None
+            
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+            
+        if self.stage_timer:
+            self.stage_timer.close()
+            self.stage_timer = None
+            
+        if self.mouse_controller:
+            self.mouse_controller.close()
+            self.mouse_controller = None
+            
         if self.cap:
             self.cap.release()
             self.cap = None
             
-    def process_video(self):
-        if not self.running:
-            return
+    def handle_result(self, result):
+        # Called on the worker thread for every processed frame; results still
+        # in flight when the mouse is stopped are ignored
+        with self.result_lock:
+            if self.running:
+                self.apply_result(result)
             
-        try:
-            ret, frame = self.cap.read()
-            if not ret:
-                raise Exception("Failed to grab frame")
-                
-            frame = cv2.flip(frame, 1)  # Mirror the frame
-            original_frame = frame.copy()
-            
-            # Detect hand and landmarks
-            frame = self.hand_detector.find_hands(frame)
-            landmark_list = self.hand_detector.find_position(frame)
+    def apply_result(self, result):
+        frame = result.frame
+        
+        if result.index_finger is not None:
+            # Map sub-pixel coordinates to screen space
+            index_x, index_y = result.index_finger[0], result.index_finger[1]
+            frame_h, frame_w = frame.shape[:2]
+            screen_x, screen_y = self.mouse_controller.map_coordinates(
+                index_x, index_y, frame_w, frame_h
+            )
             
-            if landmark_list:
-                # Get gesture states and index finger position
-                left_click, right_click, index_finger = self.hand_detector.get_gesture_state(landmark_list)
-                
-                if index_finger:
-                    # Map coordinates to screen space
-                    frame_h, frame_w = original_frame.shape[:2]
-                    screen_x, screen_y = self.mouse_controller.map_coordinates(
-                        index_finger[1], index_finger[2], frame_w, frame_h
-                    )
-                    
-                    # Move mouse
-                    self.mouse_controller.move(screen_x, screen_y)
-                    
-                    # Draw cursor position
-                    cv2.circle(frame, (index_finger[1], index_finger[2]), 10, (0, 255, 0), cv2.FILLED)
-                
-                # Handle clicks
-                if left_click and self.mouse_controller.left_click():
-                    cv2.putText(frame, "Left Click!", (50, 50), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                
-                if right_click and self.mouse_controller.right_click():
-                    cv2.putText(frame, "Right Click!", (50, 100), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+            # Move mouse, smoothing against the frame's capture time
+            self.mouse_controller.move(screen_x, screen_y, timestamp=result.capture_time)
+            if self.first_move_pending:
+                self.first_move_pending = False
+                elapsed_ms = (time.perf_counter() - self.start_time) * 1000.0
+                self.first_move_times.append(elapsed_ms)
+                print(f"First cursor move {elapsed_ms:.0f} ms after start")
             
-            # Resize frame to fit video label while maintaining aspect ratio
-            frame_h, frame_w = frame.shape[:2]
-            video_w = self.video_frame.winfo_width()
-            video_h = self.video_frame.winfo_height()
-            
-            if video_w > 0 and video_h > 0:
-                # Calculate scaling factor to fit frame in video area
-                scale_w = video_w / frame_w
-                scale_h = video_h / frame_h
-                scale = min(scale_w, scale_h)
-                
-                # Calculate new dimensions
-                new_w = int(frame_w * scale)
-                new_h = int(frame_h * scale)
-                
-                # Resize frame
-                frame = cv2.resize(frame, (new_w, new_h))
+            # Draw cursor position
+            cv2.circle(frame, (int(index_x), int(index_y)), 10, (0, 255, 0), cv2.FILLED)
+        
+        # Handle clicks: the left gesture holds the button (click, double-click,
+        # drag), the right gesture clicks once per confirmed gesture
+        events = self.gesture_engine.update(result.left_click, result.right_click, result.capture_time)
+        performed = self.mouse_controller.perform(events)
+        
+        if 'left' in self.mouse_controller.held_buttons:
+            cv2.putText(frame, "Left Down", (50, 50), 
+                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        
+        if ('click', 'right') in performed:
+            cv2.putText(frame, "Right Click!", (50, 100), 
+                      cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
             
-            # Convert frame for display
-            cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(cv2image)
-            imgtk = ImageTk.PhotoImage(image=img)
-            self.video_label.imgtk = imgtk
-            self.video_label.configure(image=imgtk)
+    def process_video(self):
+        # Preview tick, decoupled from tracking: the worker drives the cursor at
+        # inference rate while the UI only repaints at preview_fps
+        if not self.running:
+            return
+        if self.capture.error:
+            self.handle_capture_error()
+            return
             
+        try:
+            result = self.worker.get_latest()
+            if result is not None:
+                if self.show_hud:
+                    self.stage_timer.draw_hud(result.frame)
+                start = time.perf_counter()
+                if self.preview.render(result.frame):
+                    # Runs on the Tk thread, outside any worker frame: kept
+                    # out of per-frame totals and feeds only its percentiles
+                    self.stage_timer.add('render', time.perf_counter() - start)
         except Exception as e:
             print(f"Frame processing error: {e}")
             
         if self.running:
-            self.root.after(10, self.process_video)
+            self.root.after(self.preview.interval_ms, self.process_video)
+            
+    def toggle_preview(self):
+        self.preview.set_visible(not self.preview.visible)
+        
+    def toggle_hud(self):
+        self.show_hud = not self.show_hud
+        
+    def get_frame_stats(self):
+        """Counts of captured, processed and dropped frames since the pipeline was built"""
+        if self.capture:
+            return self.capture.get_stats()
+        return {'captured': 0, 'processed': 0, 'dropped': 0, 'read_failures': 0}
+        
+    def get_stage_stats(self):
+        """p50/p95/p99 milliseconds per pipeline stage since the pipeline was built"""
+        if self.stage_timer:
+            return self.stage_timer.summary()
+        return {}
+        
+    def get_pointer_metrics(self):
+        """Measured pipeline latency and prediction error, when prediction is enabled"""
+        if self.mouse_controller:
+            return self.mouse_controller.get_metrics()
+        return {}
+        
+    def get_gesture_metrics(self):
+        """Gesture event count and gesture-to-click latency"""
+        return self.gesture_engine.get_metrics()
+        
+    def get_start_latency(self):
+        """Milliseconds from each start to its first cursor move"""
+        return list(self.first_move_times)
         
     def run(self):
         try:
             self.root.mainloop()
         finally:
-            if self.cap:
-                self.cap.release()
+            self.running = False
+            self.release_pipeline()
             cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    vm = VirtualMouse()
+    parser = argparse.ArgumentParser(description="Virtual Mouse")
+    parser.add_argument('--source', default='0',
+                        help="camera index, video file, image directory/glob or 'synthetic'")
+    parser.add_argument('--worker', choices=['thread', 'process'], default='thread',
+                        help="run hand detection on a thread or in a separate process")
+    parser.add_argument('--record', metavar='PATH',
+                        help="append detected landmarks to a landmark log")
+    parser.add_argument('--filter', choices=sorted(FILTERS), default='ema',
+                        help="cursor smoothing filter")
+    parser.add_argument('--predict', action='store_true',
+                        help="compensate pipeline latency by extrapolating the fingertip")
+    parser.add_argument('--output', choices=['pyautogui', 'xlib'], default='pyautogui',
+                        help="pointer output backend")
+    parser.add_argument('--preview-fps', type=float, default=15,
+                        help="camera preview refresh rate (tracking is not limited by it)")
+    parser.add_argument('--roi', action='store_true',
+                        help="track the hand in a crop around its last position")
+    parser.add_argument('--latency-budget', type=float, metavar='MS',
+                        help="adapt inference resolution, model and frame skipping to this per-frame budget")
+    parser.add_argument('--max-hands', type=int, default=1,
+                        help="hands to track; with 2, one hand can point while the other clicks")
+    parser.add_argument('--camera-size', default='640x480', metavar='WxH',
+                        help="requested camera resolution")
+    parser.add_argument('--negotiate-camera', action='store_true',
+                        help="probe camera formats and frame rates and use the lowest-latency mode")
+    parser.add_argument('--confirm-frames', type=int, default=2,
+                        help="consecutive frames a click gesture must be seen before it presses")
+    parser.add_argument('--targets', type=int, default=3,
+                        help="apples per round; use hundreds or thousands as a pointer precision stress test")
+    parser.add_argument('--hud', action='store_true',
+                        help="overlay per-stage latency percentiles on the preview (Ctrl+H)")
+    parser.add_argument('--stage-log', metavar='PATH',
+                        help="append per-frame stage timings to a JSON-lines file")
+    args = parser.parse_args()
+    
+    vm = VirtualMouse(source=args.source, worker_mode=args.worker,
+                      record_path=args.record, pointer_filter=args.filter,
+                      predict=args.predict, output=args.output,
+                      preview_fps=args.preview_fps, roi_tracking=args.roi,
+                      latency_budget_ms=args.latency_budget, hud=args.hud,
+                      stage_log=args.stage_log,
+                      camera_size=tuple(int(v) for v in args.camera_size.lower().split('x')),
+                      negotiate_camera=args.negotiate_camera,
+                      confirm_frames=args.confirm_frames, max_hands=args.max_hands,
+                      targets=args.targets)
     vm.run()
\ No newline at end of file
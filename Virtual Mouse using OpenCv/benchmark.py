@@ -0,0 +1,358 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from types import SimpleNamespace
+import cv2
+import numpy as np
+from frame_source import FileSource, open_frame_source
+from gesture_events import GestureEventEngine
+from gesture_classifier import NUM_LANDMARKS, classify_gestures
+from hand_detector import HandDetector
+from hand_tracks import HandTrackManager, extract_landmarks
+from landmark_log import LandmarkRecording
+from mouse_controller import MouseController
+from pointer_backends import NullBackend
+from pointer_filters import FILTERS, make_filter
+from stage_timer import StageTimer
+
+# Headless benchmark of the hand-to-pointer pipeline: frames from a video,
+# image sequence or the synthetic source go through HandDetector,
+# get_gesture_state and a MouseController writing to a NullBackend. No camera,
+# display or GPU is needed.
+
+DEFAULT_RESOLUTIONS = ('320x240', '640x480', '1280x720')
+
+def _hand_template():
+    # Open right hand, normalized to a unit palm: wrist at the origin, fingers
+    # fanned upwards (negative y), thumb towards +x
+    landmarks = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    angles = np.radians([55, 20, 0, -18, -36])
+    base_distance = [0.35, 0.9, 0.95, 0.9, 0.8]
+    segment = [0.3, 0.35, 0.38, 0.35, 0.28]
+    for finger in range(5):
+        direction = np.array([np.sin(angles[finger]), -np.cos(angles[finger])])
+        for joint in range(4):
+            x, y = direction * (base_distance[finger] + segment[finger] * joint)
+            landmarks[1 + finger * 4 + joint, :2] = x, y
+    return landmarks
+
+HAND_TEMPLATE = _hand_template()
+
+def synthetic_hand(t, size=0.12):
+    """Normalized (21, 3) landmarks of an open hand drifting along a Lissajous path"""
+    cx = 0.5 + 0.3 * np.sin(1.3 * t)
+    cy = 0.65 + 0.2 * np.sin(0.9 * t + 0.5)
+    landmarks = HAND_TEMPLATE * size
+    landmarks[:, 0] += cx
+    landmarks[:, 1] += cy
+    return landmarks
+
+def synthetic_results(t, count):
+    """MediaPipe-shaped result with count synthetic hands on separate paths"""
+    hands, handedness = [], []
+    for k in range(count):
+        landmarks = synthetic_hand(t + 2.0 * np.pi * k / count)
+        hands.append(SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in landmarks]))
+        label = 'Left' if k % 2 else 'Right'
+        handedness.append(SimpleNamespace(classification=[SimpleNamespace(label=label, score=1.0)]))
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+class LandmarkReplay:
+    """Cycles through the hands in a landmark log"""
+
+    def __init__(self, path):
+        recording = LandmarkRecording(path)
+        self.landmarks = np.asarray(recording.landmarks[recording.hand_present], dtype=np.float32)
+        if not len(self.landmarks):
+            raise ValueError(f"{path} contains no hands")
+        self.index = 0
+
+    def __call__(self, t):
+        landmarks = self.landmarks[self.index % len(self.landmarks)]
+        self.index += 1
+        return landmarks
+
+def _open_source(spec, size):
+    if spec.startswith('synthetic'):
+        return open_frame_source(f'synthetic:{size[0]}x{size[1]}', realtime=False)
+    # Recorded input loops so every resolution gets the same number of frames
+    return FileSource(spec, realtime=False, loop=True)
+
+class PipelineBench:
+    """One resolution: source -> detector -> gestures -> pointer output"""
+
+    def __init__(self, source, size, detector_kwargs=None, pointer_filter='ema', fallback_hand=None):
+        self.source = source
+        self.size = size
+        self.detector = HandDetector(**(detector_kwargs or {}))
+        self.mouse = MouseController(pointer_filter=make_filter(pointer_filter), backend=NullBackend())
+        self.gesture_engine = GestureEventEngine()
+        # Landmarks fed to the gesture and output stages on frames without a
+        # detected hand, so those stages are measured on synthetic input too
+        self.fallback_hand = fallback_hand or synthetic_hand
+        self.landmarks_px = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.frames = 0
+        self.hands_detected = 0
+
+    def step(self, timer):
+        timer.begin()
+        ret, frame = self.source.read()
+        if not ret:
+            raise RuntimeError("Frame source ended")
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        timer.mark('capture')
+
+        frame = self.detector.find_hands(frame)
+        landmarks = self.detector.find_landmarks(frame)
+        if landmarks is not None:
+            self.hands_detected += 1
+        else:
+            width, height = self.size
+            np.multiply(self.fallback_hand(self.frames / 30.0), (width, height, width), out=self.landmarks_px)
+            landmarks = self.landmarks_px
+        left_click, right_click, index_finger = self.detector.get_gesture_state(
+            landmarks, self.detector.get_handedness()
+        )
+        timer.mark('gesture')
+
+        now = time.perf_counter()
+        screen_x, screen_y = self.mouse.map_coordinates(index_finger[0], index_finger[1], *self.size)
+        self.mouse.move(screen_x, screen_y, timestamp=now)
+        self.mouse.perform(self.gesture_engine.update(left_click, right_click, now))
+        timer.mark('output')
+        timer.end_frame()
+        self.frames += 1
+
+    def run(self, frames, warmup=30):
+        # Warm-up frames cover model loading and MediaPipe's first-frame setup
+        discard = StageTimer(capacity=max(1, warmup))
+        for _ in range(warmup):
+            self.step(discard)
+
+        timer = StageTimer(capacity=frames)
+        self.detector.stage_timer = timer
+        self.hands_detected = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            self.step(timer)
+        elapsed = time.perf_counter() - start
+        self.detector.stage_timer = None
+
+        return {
+            'fps': frames / elapsed,
+            'hand_detected': self.hands_detected / frames,
+            'stages': timer.summary()
+        }
+
+    def measure_allocations(self, frames, top=5):
+        """Python-heap allocations per frame, from tracemalloc.
+
+        MediaPipe's native allocations are not visible to tracemalloc; these
+        numbers cover the Python side of the pipeline (frame handling, result
+        objects, gesture and pointer code).
+        """
+        timer = StageTimer(capacity=frames)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        peaks = []
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            self.step(timer)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+        retained = sum(stat.count_diff for stat in stats)
+        return {
+            'frames': frames,
+            'peak_kib_p50': float(np.percentile(peaks, 50)) / 1024.0,
+            'peak_kib_max': max(peaks) / 1024.0,
+            'retained_blocks_per_frame': retained / frames,
+            'top_retained': [
+                {'site': str(stat.traceback), 'blocks': stat.count_diff, 'kib': stat.size_diff / 1024.0}
+                for stat in stats[:top] if stat.count_diff > 0
+            ]
+        }
+
+    def close(self):
+        self.source.release()
+        self.detector.close()
+
+def run_benchmark(source='synthetic', resolutions=DEFAULT_RESOLUTIONS, frames=300, warmup=30,
+                  alloc_frames=50, detector_kwargs=None, pointer_filter='ema', landmarks=None):
+    fallback_hand = LandmarkReplay(landmarks) if landmarks else None
+    results = []
+    for resolution in resolutions:
+        size = tuple(int(v) for v in resolution.lower().split('x'))
+        bench = PipelineBench(_open_source(source, size), size, detector_kwargs, pointer_filter, fallback_hand)
+        try:
+            result = {'resolution': resolution}
+            result.update(bench.run(frames, warmup))
+            if alloc_frames:
+                result['allocations'] = bench.measure_allocations(alloc_frames)
+        finally:
+            bench.close()
+        results.append(result)
+
+    import mediapipe
+    return {
+        'meta': {
+            'time': time.time(),
+            'source': source,
+            'frames': frames,
+            'warmup': warmup,
+            'detector': detector_kwargs or {},
+            'filter': pointer_filter,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'mediapipe': getattr(mediapipe, '__version__', 'unknown')
+        },
+        'results': results
+    }
+
+def _percentiles(seconds):
+    ms = np.array(seconds) * 1000.0
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95))}
+
+def run_hand_scaling(source='synthetic', resolution='640x480', hand_counts=(1, 2, 3, 4), frames=200, warmup=20):
+    """Inference and post-processing cost as the number of tracked hands grows.
+
+    Inference runs the detector with max_num_hands set to each count; how
+    many hands it actually finds depends on the footage (none with the
+    synthetic source, which then measures palm detection alone).
+    Post-processing - landmark extraction, track matching, stacking and
+    gesture classification - runs on that many synthetic hands, so it always
+    scales with the count.
+    """
+    size = tuple(int(v) for v in resolution.lower().split('x'))
+    width, height = size
+    results = []
+    for count in hand_counts:
+        source_frames = _open_source(source, size)
+        detector = HandDetector(max_hands=count)
+        inference, hands_seen = [], 0
+        try:
+            for i in range(warmup + frames):
+                ret, frame = source_frames.read()
+                if not ret:
+                    raise RuntimeError("Frame source ended")
+                if (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size)
+                start = time.perf_counter()
+                detector.find_hands(frame, draw=False)
+                if i >= warmup:
+                    inference.append(time.perf_counter() - start)
+                    hands_seen += len(detector.results.multi_hand_landmarks or ())
+        finally:
+            source_frames.release()
+            detector.close()
+
+        manager = HandTrackManager(count, smoothing=1.0)
+        norm = np.zeros((count, NUM_LANDMARKS, 3), dtype=np.float32)
+        codes = np.zeros(count, dtype=np.int8)
+        pixels = np.zeros((count, NUM_LANDMARKS, 3), dtype=np.float32)
+        # Results are built up front so only the post-processing is timed
+        inputs = [synthetic_results(i / 30.0, count) for i in range(warmup + frames)]
+        post = []
+        for i, fake in enumerate(inputs):
+            start = time.perf_counter()
+            detected = extract_landmarks(fake.multi_hand_landmarks, fake.multi_handedness, norm, codes)
+            ids, handedness, landmarks = manager.update(norm[:detected], codes[:detected], i / 30.0)
+            np.multiply(landmarks, (width, height, width), out=pixels[:len(ids)])
+            classify_gestures(pixels[:len(ids)], handedness)
+            if i >= warmup:
+                post.append(time.perf_counter() - start)
+
+        results.append({
+            'hands': count,
+            'hands_detected': hands_seen / frames,
+            'inference': _percentiles(inference),
+            'post_processing': _percentiles(post),
+            'track_ids': manager.next_id  # More than the count means identities were lost
+        })
+    return {'resolution': resolution, 'source': source, 'results': results}
+
+def print_hand_scaling(scaling):
+    print(f"Hand count scaling at {scaling['resolution']} ({scaling['source']})")
+    print(f"  {'hands':>5} {'detected':>8} {'infer p50':>9} {'p95':>7} {'post p50':>9} {'p95':>7}  (ms)")
+    for r in scaling['results']:
+        print(f"  {r['hands']:>5} {r['hands_detected']:8.2f} {r['inference']['p50_ms']:9.2f} "
+              f"{r['inference']['p95_ms']:7.2f} {r['post_processing']['p50_ms']:9.3f} "
+              f"{r['post_processing']['p95_ms']:7.3f}")
+
+def print_report(report, baseline=None):
+    previous = {}
+    if baseline:
+        previous = {r['resolution']: r for r in baseline['results']}
+
+    for result in report['results']:
+        line = f"{result['resolution']:>10}: {result['fps']:6.1f} fps, hand in {result['hand_detected']:.0%} of frames"
+        old = previous.get(result['resolution'])
+        if old:
+            line += f" ({(result['fps'] / old['fps'] - 1):+.1%} fps vs baseline)"
+        print(line)
+
+        print(f"  {'stage':<10} {'p50':>7} {'p95':>7} {'p99':>7}  (ms)")
+        for stage, s in result['stages'].items():
+            row = f"  {stage:<10} {s['p50_ms']:7.2f} {s['p95_ms']:7.2f} {s['p99_ms']:7.2f}"
+            if old and stage in old['stages']:
+                row += f"  p95 {s['p95_ms'] - old['stages'][stage]['p95_ms']:+.2f}"
+            print(row)
+
+        allocations = result.get('allocations')
+        if allocations:
+            print(f"  python heap: {allocations['peak_kib_p50']:.1f} KiB peak per frame (p50), "
+                  f"{allocations['retained_blocks_per_frame']:.2f} blocks retained per frame")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark of the hand-to-pointer pipeline")
+    parser.add_argument('--source', default='synthetic',
+                        help="'synthetic' or a video file / image directory / glob")
+    parser.add_argument('--resolutions', nargs='+', default=list(DEFAULT_RESOLUTIONS), metavar='WxH')
+    parser.add_argument('--frames', type=int, default=300, help="timed frames per resolution")
+    parser.add_argument('--warmup', type=int, default=30)
+    parser.add_argument('--alloc-frames', type=int, default=50,
+                        help="frames traced with tracemalloc after timing (0 to skip)")
+    parser.add_argument('--landmarks', metavar='LOG',
+                        help="landmark log replayed into the gesture stages when no hand is detected")
+    parser.add_argument('--filter', choices=sorted(FILTERS), default='ema')
+    parser.add_argument('--roi', action='store_true', help="benchmark ROI-cropped tracking")
+    parser.add_argument('--latency-budget', type=float, metavar='MS',
+                        help="run the detector under a LatencyGovernor with this budget")
+    parser.add_argument('--hand-counts', type=int, nargs='+', metavar='N',
+                        help="also measure cost against the number of tracked hands, at the first resolution")
+    parser.add_argument('--output', metavar='JSON', help="write results as JSON")
+    parser.add_argument('--compare', metavar='JSON', help="earlier results to compare against")
+    args = parser.parse_args()
+
+    detector_kwargs = {'roi_tracking': args.roi, 'latency_budget_ms': args.latency_budget}
+    report = run_benchmark(args.source, args.resolutions, args.frames, args.warmup, args.alloc_frames,
+                           detector_kwargs, args.filter, args.landmarks)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.hand_counts:
+        report['hand_scaling'] = run_hand_scaling(args.source, args.resolutions[0], args.hand_counts,
+                                                  args.frames, args.warmup)
+        print_hand_scaling(report['hand_scaling'])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import time
+import cv2
+import numpy as np
+from frame_source import CameraSource
+
+# Capture negotiation for live cameras. Drivers silently fall back to other
+# modes, so everything here reads the delivered settings back and measures
+# what the camera actually does instead of trusting what was requested.
+
+FOURCCS = ('MJPG', 'YUYV')
+FPS_CANDIDATES = (60, 30)
+
+def fourcc_code(name):
+    return cv2.VideoWriter_fourcc(*name)
+
+def fourcc_name(code):
+    code = int(code)
+    name = ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    return name if name.isprintable() and name.strip() else '?'
+
+class CaptureMode:
+    def __init__(self, fourcc=None, width=640, height=480, fps=30, buffer_size=1):
+        self.fourcc = fourcc            # None leaves the driver's pixel format alone
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer_size = buffer_size
+
+    def __repr__(self):
+        return f"{self.fourcc or 'default'} {self.width}x{self.height}@{self.fps:g} buffer={self.buffer_size}"
+
+def apply_mode(cap, mode):
+    """Request a mode and return the CaptureMode the driver reports back"""
+    # The pixel format goes first: some backends reset the size when it changes
+    if mode.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, fourcc_code(mode.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode.height)
+    cap.set(cv2.CAP_PROP_FPS, mode.fps)
+    # Not every backend supports this; a one-frame queue keeps reads current
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, mode.buffer_size)
+    return read_mode(cap)
+
+def read_mode(cap):
+    return CaptureMode(
+        fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+        int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        cap.get(cv2.CAP_PROP_FPS),
+        int(cap.get(cv2.CAP_PROP_BUFFERSIZE))
+    )
+
+def measure(cap, frames=30, warmup=5, idle=0.2):
+    """Measure the delivered frame interval and how stale reads are.
+
+    latency_ms compares the driver's buffer timestamp (CAP_PROP_POS_MSEC, on
+    the monotonic clock with V4L2) against the time read() returns, when the
+    backend provides one. queued_frames counts frames that come back
+    immediately after idling, i.e. frames the driver had buffered; each one
+    adds a full frame interval of latency to every read.
+    """
+    for _ in range(warmup):
+        cap.read()
+
+    read_times = []
+    latencies = []
+    for _ in range(frames):
+        ret, _ = cap.read()
+        now = time.perf_counter()
+        if not ret:
+            continue
+        read_times.append(now)
+        stamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if stamp > 0:
+            latency = time.monotonic() * 1000.0 - stamp
+            if 0 <= latency < 1000:
+                latencies.append(latency)
+
+    if len(read_times) < 2:
+        return None
+    intervals = np.diff(read_times) * 1000.0
+    interval = float(np.median(intervals))
+
+    # After idling, queued frames return much faster than the frame interval
+    time.sleep(idle)
+    queued = 0
+    for _ in range(8):
+        start = time.perf_counter()
+        ret, _ = cap.read()
+        if not ret or (time.perf_counter() - start) * 1000.0 > interval * 0.25:
+            break
+        queued += 1
+
+    return {
+        'fps': 1000.0 / interval if interval > 0 else 0.0,
+        'interval_ms': interval,
+        'jitter_ms': float(np.std(intervals)),
+        'latency_ms': float(np.median(latencies)) if latencies else None,
+        'queued_frames': queued,
+        # Wait for the next frame (half an interval on average) plus the queue
+        'estimated_latency_ms': interval * (0.5 + queued)
+    }
+
+def probe_modes(cap, width, height, fourccs=FOURCCS, fps_candidates=FPS_CANDIDATES,
+                buffer_size=1, frames=30):
+    """Try each format/fps combination and measure the modes actually delivered"""
+    results = []
+    seen = set()
+    for fourcc in fourccs:
+        for fps in fps_candidates:
+            requested = CaptureMode(fourcc, width, height, fps, buffer_size)
+            delivered = apply_mode(cap, requested)
+            key = (delivered.fourcc, delivered.width, delivered.height, round(delivered.fps))
+            if key in seen:
+                # Driver fell back to a mode we already measured
+                continue
+            seen.add(key)
+            stats = measure(cap, frames)
+            if stats:
+                results.append({'requested': requested, 'delivered': delivered, 'stats': stats})
+    return results
+
+def _latency(stats):
+    # Prefer the driver's own timestamps over the estimate when we have them
+    if stats['latency_ms'] is not None:
+        return stats['latency_ms']
+    return stats['estimated_latency_ms']
+
+def choose_mode(results, width, height):
+    """Lowest latency among modes at least width x height, smaller frames on ties"""
+    usable = [r for r in results
+              if r['delivered'].width >= width and r['delivered'].height >= height]
+    if not usable:
+        return None
+    return min(usable, key=lambda r: (round(_latency(r['stats']), 1),
+                                      r['delivered'].width * r['delivered'].height))
+
+def negotiate(cap, width=640, height=480, fourccs=FOURCCS, fps_candidates=FPS_CANDIDATES, frames=30):
+    """Probe the camera and apply the lowest-latency mode meeting the resolution"""
+    results = probe_modes(cap, width, height, fourccs, fps_candidates, frames=frames)
+    for r in results:
+        stats = r['stats']
+        latency = f", driver latency {stats['latency_ms']:.1f} ms" if stats['latency_ms'] is not None else ""
+        print(f"  {r['delivered']}: {stats['fps']:.1f} fps, {stats['queued_frames']} queued, "
+              f"~{stats['estimated_latency_ms']:.1f} ms{latency}")
+
+    best = choose_mode(results, width, height)
+    if best is None:
+        print(f"Camera negotiation: no mode delivers {width}x{height}, keeping driver defaults")
+        return None
+
+    best['delivered'] = apply_mode(cap, best['requested'])
+    stats = best['stats']
+    print(f"Camera negotiation: using {best['delivered']}")
+    if stats['fps'] < best['requested'].fps * 0.9:
+        # Usually auto-exposure lengthening frames in low light
+        print(f"  delivered {stats['fps']:.1f} fps of {best['requested'].fps} requested "
+              f"(auto-exposure may be limiting the frame rate)")
+    return best
+
+def configure_camera(source, width=640, height=480, fps=30, negotiate_mode=False):
+    """Apply capture settings to a live camera source; other sources are left alone.
+
+    Without negotiation this only requests the size, frame rate and a
+    one-frame driver buffer; with it, formats and rates are probed first.
+    """
+    if not isinstance(source, CameraSource) or not source.isOpened():
+        return None
+    if negotiate_mode:
+        best = negotiate(source.cap, width, height)
+        return best['delivered'] if best else read_mode(source.cap)
+    delivered = apply_mode(source.cap, CaptureMode(None, width, height, fps, buffer_size=1))
+    if (delivered.width, delivered.height) != (width, height):
+        print(f"Camera delivers {delivered.width}x{delivered.height} instead of {width}x{height}")
+    return delivered
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Probe camera capture modes and their latency")
+    parser.add_argument('--camera', type=int, default=0)
+    parser.add_argument('--size', default='640x480', help="minimum resolution, WxH")
+    parser.add_argument('--frames', type=int, default=30, help="frames measured per mode")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    source = CameraSource(args.camera)
+    if not source.isOpened():
+        print(f"Could not open camera {args.camera}")
+        return
+    try:
+        print(f"Driver default: {read_mode(source.cap)}")
+        negotiate(source.cap, width, height, frames=args.frames)
+    finally:
+        source.release()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import cv2
+import threading
+import time
+from collections import deque
+
+class CaptureThread:
+    """Reads frames on a background thread and keeps only the newest ones"""
+
+    def __init__(self, cap, buffer_size=1, mirror=True, max_failures=50):
+        self.cap = cap
+        self.mirror = mirror
+        self.buffer = deque(maxlen=max(1, min(buffer_size, 2)))
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        # Paused captures stop reading, so a file source is not used up while
+        # nobody is watching; resuming drops the frames the driver queued
+        self.paused = False
+        self.discard = 0
+        # Consecutive failed reads before the source is treated as lost
+        self.max_failures = max_failures
+        self.consecutive_failures = 0
+        self.error = None
+
+        # Pipeline counters
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0
+        self.read_failures = 0
+        self.sequence = 0
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, name="CaptureThread", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def pause(self):
+        with self.condition:
+            self.paused = True
+            self.buffer.clear()
+
+    def resume(self):
+        with self.condition:
+            self.paused = False
+            # File and synthetic sources report no driver buffer and lose nothing
+            self.discard = int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE) or 0)
+            self.condition.notify_all()
+
+    def _capture_loop(self):
+        while self.running:
+            with self.condition:
+                self.condition.wait_for(lambda: not self.paused or not self.running)
+            if not self.running:
+                break
+
+            ret, frame = self.cap.read()
+            timestamp = time.perf_counter()
+
+            if not ret:
+                self.read_failures += 1
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.max_failures:
+                    # Unplugged camera or finished file: stop instead of serving a frozen frame
+                    self.error = "Failed to grab frame"
+                    print(f"Capture error: {self.error} ({self.consecutive_failures} reads in a row)")
+                    with self.condition:
+                        self.running = False
+                        self.condition.notify_all()
+                    break
+                # Back off briefly so a disconnected camera doesn't spin the CPU
+                time.sleep(0.01)
+                continue
+            self.consecutive_failures = 0
+
+            if self.paused:
+                continue
+            if self.discard:
+                # Captured before the pause, so older than it looks
+                self.discard -= 1
+                continue
+
+            if self.mirror:
+                frame = cv2.flip(frame, 1)
+
+            with self.condition:
+                if self.paused:
+                    continue
+                self.sequence += 1
+                self.frames_captured += 1
+                # Latest frame wins: the oldest buffered frame is discarded
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.frames_dropped += 1
+                self.buffer.append((self.sequence, timestamp, frame))
+                self.condition.notify()
+
+    def read(self, timeout=None):
+        """Return (sequence, timestamp, frame) for the newest frame, or None"""
+        with self.condition:
+            if not self.buffer and timeout:
+                self.condition.wait_for(lambda: self.buffer or not self.running, timeout)
+            if not self.buffer:
+                return None
+
+            item = self.buffer.pop()
+            # Anything older than the newest frame is stale once we've consumed it
+            self.frames_dropped += len(self.buffer)
+            self.buffer.clear()
+            self.frames_processed += 1
+            return item
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                'captured': self.frames_captured,
+                'processed': self.frames_processed,
+                'dropped': self.frames_dropped,
+                'read_failures': self.read_failures
+            }
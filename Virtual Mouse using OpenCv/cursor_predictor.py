@@ -0,0 +1,113 @@
+import math
+import time
+from collections import deque
+
+class LatencyPredictor:
+    """Extrapolates the cursor forward by the measured capture-to-output latency"""
+
+    def __init__(self, history=5, max_lead_px=80.0, error_threshold_px=20.0,
+                 latency_smoothing=0.1, error_smoothing=0.2, extra_latency=0.0):
+        self.history = deque(maxlen=max(2, history))  # (capture_time, x, y)
+        self.pending = deque(maxlen=64)               # (target_time, x, y) predictions not yet scored
+        self.max_lead_px = max_lead_px
+        self.error_threshold_px = error_threshold_px
+        self.latency_smoothing = latency_smoothing
+        self.error_smoothing = error_smoothing
+        # Delay before the capture timestamp (exposure, driver) that we cannot measure
+        self.extra_latency = extra_latency
+
+        self.latency = None
+        self.prediction_error = 0.0
+        self.gain = 1.0
+
+    def reset(self):
+        self.history.clear()
+        self.pending.clear()
+        self.gain = 1.0
+
+    def predict(self, x, y, capture_time, now=None):
+        if now is None:
+            now = time.perf_counter()
+
+        # Track pipeline latency from the capture stage's timestamp
+        latency = max(0.0, now - capture_time) + self.extra_latency
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += (latency - self.latency) * self.latency_smoothing
+
+        if self.history and capture_time - self.history[-1][0] > 0.5:
+            # Hand was lost; old motion says nothing about the new position
+            self.reset()
+
+        self._score(capture_time, x, y)
+        self.history.append((capture_time, x, y))
+        if len(self.history) < 2:
+            return x, y
+
+        vx, vy = self._velocity()
+        lead_x = vx * self.latency * self.gain
+        lead_y = vy * self.latency * self.gain
+
+        # Overshoot limiting: never lead further than max_lead_px
+        lead = math.hypot(lead_x, lead_y)
+        if lead > self.max_lead_px:
+            scale = self.max_lead_px / lead
+            lead_x *= scale
+            lead_y *= scale
+
+        predicted_x, predicted_y = x + lead_x, y + lead_y
+        self.pending.append((capture_time + self.latency, predicted_x, predicted_y))
+        return predicted_x, predicted_y
+
+    def _velocity(self):
+        # Least-squares slope over the history window
+        t0 = self.history[0][0]
+        n = len(self.history)
+        mean_t = sum(t - t0 for t, _, _ in self.history) / n
+        mean_x = sum(x for _, x, _ in self.history) / n
+        mean_y = sum(y for _, _, y in self.history) / n
+        var_t = sum((t - t0 - mean_t) ** 2 for t, _, _ in self.history)
+        if var_t <= 0:
+            return 0.0, 0.0
+        vx = sum((t - t0 - mean_t) * (x - mean_x) for t, x, _ in self.history) / var_t
+        vy = sum((t - t0 - mean_t) * (y - mean_y) for t, _, y in self.history) / var_t
+
+        # When the latest step is slower or turns away, the fit overshoots a
+        # stop; fall back to the most recent segment's velocity
+        (t1, x1, y1), (t2, x2, y2) = self.history[-2], self.history[-1]
+        dt = t2 - t1
+        if dt > 0:
+            lx, ly = (x2 - x1) / dt, (y2 - y1) / dt
+            if lx * vx + ly * vy <= 0:
+                return 0.0, 0.0
+            if math.hypot(lx, ly) < math.hypot(vx, vy):
+                return lx, ly
+        return vx, vy
+
+    def _score(self, capture_time, x, y):
+        # Compare earlier predictions with where the cursor actually was at
+        # their target time, interpolating between the last two samples
+        while self.pending and self.pending[0][0] <= capture_time:
+            target_time, px, py = self.pending.popleft()
+            ax, ay = x, y
+            if self.history:
+                t1, x1, y1 = self.history[-1]
+                if capture_time > t1 and target_time > t1:
+                    f = (target_time - t1) / (capture_time - t1)
+                    ax, ay = x1 + (x - x1) * f, y1 + (y - y1) * f
+            error = math.hypot(px - ax, py - ay)
+            self.prediction_error += (error - self.prediction_error) * self.error_smoothing
+
+        # Back off quickly when predictions miss, recover slowly when they hit
+        if self.prediction_error > self.error_threshold_px:
+            self.gain = max(0.0, self.gain * 0.8)
+        else:
+            self.gain = min(1.0, self.gain + 0.02)
+
+    def get_metrics(self):
+        return {
+            'latency_ms': (self.latency or 0.0) * 1000.0,
+            'prediction_error_px': self.prediction_error,
+            'gain': self.gain
+        }
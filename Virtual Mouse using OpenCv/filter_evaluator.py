@@ -0,0 +1,163 @@
+import argparse
+import inspect
+import numpy as np
+from gesture_classifier import INDEX_TIP
+from landmark_log import LandmarkRecording
+from pointer_filters import FILTERS, make_filter
+
+def trace_from_recording(recording, screen_width=1920, screen_height=1080):
+    """Index fingertip trace in screen pixels, from frames where a hand was present"""
+    present = recording.hand_present
+    timestamps = np.asarray(recording.timestamps[present], dtype=np.float64)
+    tips = recording.landmarks[present, INDEX_TIP, :2]
+    positions = tips * np.array([screen_width, screen_height], dtype=np.float64)
+    return timestamps, positions
+
+def synthetic_trace(seconds=20.0, rate=30.0, noise=2.0, seed=0, moves=True):
+    """Alternating rest and fast-move segments with Gaussian landmark noise; moves=False holds still"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(0, seconds, 1.0 / rate)
+    truth = np.zeros((len(timestamps), 2))
+    position = np.array([960.0, 540.0])
+    for i, t in enumerate(timestamps):
+        phase = t % 4.0
+        if moves and 2.0 <= phase < 3.0:
+            # One second sweep across a third of the screen
+            direction = 1 if int(t // 4) % 2 == 0 else -1
+            position = position + direction * np.array([640.0, 200.0]) / rate
+        truth[i] = position
+    return timestamps, truth + rng.normal(0, noise, truth.shape)
+
+def run_filter(pointer_filter, timestamps, positions):
+    pointer_filter.reset()
+    filtered = np.empty_like(positions)
+    for i in range(len(timestamps)):
+        filtered[i] = pointer_filter.filter(positions[i, 0], positions[i, 1], timestamps[i])
+    return filtered
+
+def rest_mask(timestamps, positions, speed_threshold=60.0, window=5):
+    """Frames where the raw trace moves slower than speed_threshold px/s over a small window"""
+    mask = np.zeros(len(timestamps), dtype=bool)
+    if len(timestamps) <= window:
+        return mask
+    distance = np.linalg.norm(positions[window:] - positions[:-window], axis=1)
+    duration = np.maximum(timestamps[window:] - timestamps[:-window], 1e-6)
+    slow = distance / duration < speed_threshold
+    # A frame is at rest only if the windows on both sides are slow
+    mask[window:-window] = slow[window:] & slow[:-window]
+    return mask
+
+def _segments(mask, min_length):
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start >= min_length:
+            yield start, end
+
+def rest_reference(positions, mask, min_length=10):
+    """The raw trace with each rest segment replaced by its mean position"""
+    reference = positions.copy()
+    for start, end in _segments(mask, min_length):
+        reference[start:end] = positions[start:end].mean(axis=0)
+    return reference
+
+def measure_jitter(filtered, reference, mask, min_length=10):
+    """RMS distance (px) between the filtered cursor and the filtered rest_reference over rest segments
+
+    Comparing against the same filter run on the noise-free reference cancels
+    the filter's settling tail after a move, which is lag rather than jitter,
+    so heavier smoothing cannot score worse just because it settles slower.
+    """
+    squared = []
+    for start, end in _segments(mask, min_length):
+        squared.append(np.sum((filtered[start:end] - reference[start:end]) ** 2, axis=1))
+    if not squared:
+        return float('nan')
+    return float(np.sqrt(np.mean(np.concatenate(squared))))
+
+def measure_lag(timestamps, positions, filtered, moving, max_lag=0.3, step=0.002):
+    """Delay (ms) that best aligns the filtered trace with the raw trace while moving"""
+    if moving.sum() < 10:
+        return float('nan')
+    best_lag, best_error = 0.0, float('inf')
+    moving_times = timestamps[moving]
+    for lag in np.arange(0.0, max_lag, step):
+        # Compare filtered output with where the raw trace was `lag` seconds earlier
+        shifted_x = np.interp(moving_times - lag, timestamps, positions[:, 0])
+        shifted_y = np.interp(moving_times - lag, timestamps, positions[:, 1])
+        error = np.mean((filtered[moving, 0] - shifted_x) ** 2 + (filtered[moving, 1] - shifted_y) ** 2)
+        if error < best_error:
+            best_lag, best_error = lag, error
+    return best_lag * 1000.0
+
+def evaluate(pointer_filter, timestamps, positions):
+    filtered = run_filter(pointer_filter, timestamps, positions)
+    rest = rest_mask(timestamps, positions)
+    reference = run_filter(pointer_filter, timestamps, rest_reference(positions, rest))
+    return {
+        'jitter_px': measure_jitter(filtered, reference, rest),
+        'lag_ms': measure_lag(timestamps, positions, filtered, ~rest),
+        'rest_frames': int(rest.sum()),
+        'frames': len(timestamps)
+    }
+
+# Per filter, one parameter from light to heavy smoothing
+SMOOTHING_SWEEPS = {
+    'ema': ('smoothing', [0.9, 0.5, 0.3, 0.1]),
+    'one_euro': ('min_cutoff', [4.0, 1.0, 0.5, 0.1]),
+    'kalman': ('process_noise', [5e6, 5e5, 5e4, 5e3])
+}
+
+def check_smoothing_order(noise=2.0, seeds=range(3)):
+    """Sweep SMOOTHING_SWEEPS on noisy traces; returns a list of the steps where more smoothing reported more jitter"""
+    failures = []
+    for moves in (False, True):
+        for seed in seeds:
+            timestamps, positions = synthetic_trace(noise=noise, seed=seed, moves=moves)
+            for name, (param, values) in SMOOTHING_SWEEPS.items():
+                jitter = [evaluate(make_filter(name, **{param: v}), timestamps, positions)['jitter_px']
+                          for v in values]
+                for i in range(1, len(values)):
+                    if jitter[i] > jitter[i - 1]:
+                        failures.append(f"{name} {param}={values[i]} ({'moving' if moves else 'static'}, "
+                                        f"seed {seed}): {jitter[i]:.2f} px > {jitter[i - 1]:.2f} px")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pointer filters on recorded fingertip traces")
+    parser.add_argument('recording', nargs='?', help="landmark log; omit to use a synthetic trace")
+    parser.add_argument('--screen', default='1920x1080', help="screen size the trace is mapped to")
+    parser.add_argument('--filters', nargs='+', default=sorted(FILTERS), choices=sorted(FILTERS))
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help="filter parameter, e.g. --param beta=0.02 (applied to every filter that accepts it)")
+    parser.add_argument('--check', action='store_true',
+                        help="verify that more smoothing never reports more jitter, then exit")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check_smoothing_order()
+        for failure in failures:
+            print(f"more smoothing, more jitter: {failure}")
+        print("smoothing order check " + ("failed" if failures else "passed"))
+        raise SystemExit(1 if failures else 0)
+
+    if args.recording:
+        width, height = (int(v) for v in args.screen.lower().split('x'))
+        timestamps, positions = trace_from_recording(LandmarkRecording(args.recording), width, height)
+    else:
+        timestamps, positions = synthetic_trace()
+
+    params = {}
+    for item in args.param:
+        name, value = item.split('=', 1)
+        params[name] = float(value)
+
+    print(f"{len(timestamps)} samples")
+    print(f"{'filter':<10} {'jitter px':>10} {'lag ms':>8}")
+    for name in args.filters:
+        accepted = inspect.signature(FILTERS[name]).parameters
+        pointer_filter = make_filter(name, **{k: v for k, v in params.items() if k in accepted})
+        result = evaluate(pointer_filter, timestamps, positions)
+        print(f"{name:<10} {result['jitter_px']:>10.2f} {result['lag_ms']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,46 @@
 import tkinter as tk
-import random
+import math
+from collections import deque
+import numpy as np
 from ui_theme import DarkTheme
+from spatial_grid import SpatialGrid, poisson_disk_sample
 import time
 
 class Apple:
+    TAG = 'apple'  # Shared by every apple item, so all of them hide in one call
+    
     def __init__(self, canvas, x, y, size=30):
         self.canvas = canvas
-        self.x = x
-        self.y = y
-        self.size = size
         
         # Create apple shape
         self.shape = canvas.create_oval(
-            x - size, y - size,
-            x + size, y + size,
+            0, 0, 0, 0,
             fill='red',
-            outline='darkred'
+            outline='darkred',
+            tags=(self.TAG,)
         )
         # Add stem
         self.stem = canvas.create_line(
-            x, y - size,
-            x, y - size - 10,
+            0, 0, 0, 0,
             fill='brown',
-            width=3
+            width=3,
+            tags=(self.TAG,)
         )
+        self.place(x, y, size)
+        
+    def place(self, x, y, size=30):
+        """Move the existing canvas items to a new position and show them"""
+        self.x = x
+        self.y = y
+        self.size = size
+        self.canvas.coords(self.shape, x - size, y - size, x + size, y + size)
+        self.canvas.coords(self.stem, x, y - size, x, y - size - 10)
+        self.canvas.itemconfigure(self.shape, state='normal')
+        self.canvas.itemconfigure(self.stem, state='normal')
+        
+    def hide(self):
+        self.canvas.itemconfigure(self.shape, state='hidden')
+        self.canvas.itemconfigure(self.stem, state='hidden')
         
     def delete(self):
         self.canvas.delete(self.shape)
@@ -34,14 +51,103 @@ class Apple:
         distance = ((click_x - self.x) ** 2 + (click_y - self.y) ** 2) ** 0.5
         return distance <= self.size
 
+class ApplePool:
+    """Hands out Apples, reusing the canvas items of collected ones"""
+    
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.free = []
+        self.created = 0
+        
+    def acquire(self, x, y, size):
+        if self.free:
+            apple = self.free.pop()
+            apple.place(x, y, size)
+            return apple
+        self.created += 1
+        return Apple(self.canvas, x, y, size)
+        
+    def release(self, apple):
+        apple.hide()
+        self.free.append(apple)
+        
+    def release_all(self, apples):
+        self.canvas.itemconfigure(Apple.TAG, state='hidden')
+        self.free.extend(apples)
+
+class EffectLayer:
+    """Short-lived text (hit marks, messages) on pooled canvas items.
+    
+    One shared tick hides expired items instead of an after() per effect;
+    it only runs while effects are showing.
+    """
+    
+    def __init__(self, canvas, tick_ms=50):
+        self.canvas = canvas
+        self.tick_ms = tick_ms
+        self.free = []
+        self.active = []  # (expiry time, item)
+        self.tick_id = None
+        
+    def show(self, x, y, text, fill, font, duration):
+        """Show text centred at (x, y) for duration milliseconds"""
+        if self.free:
+            item = self.free.pop()
+            self.canvas.coords(item, x, y)
+            self.canvas.itemconfigure(item, text=text, fill=fill, font=font, state='normal')
+        else:
+            item = self.canvas.create_text(x, y, text=text, fill=fill, font=font)
+        # Reused items may sit below apples drawn since
+        self.canvas.tag_raise(item)
+        self.active.append((time.perf_counter() + duration / 1000.0, item))
+        if self.tick_id is None:
+            self.tick_id = self.canvas.after(self.tick_ms, self._tick)
+            
+    def _tick(self):
+        now = time.perf_counter()
+        remaining = []
+        for expiry, item in self.active:
+            if expiry <= now:
+                self.canvas.itemconfigure(item, state='hidden')
+                self.free.append(item)
+            else:
+                remaining.append((expiry, item))
+        self.active = remaining
+        self.tick_id = self.canvas.after(self.tick_ms, self._tick) if self.active else None
+        
+    def clear(self):
+        if self.tick_id is not None:
+            self.canvas.after_cancel(self.tick_id)
+            self.tick_id = None
+        for _, item in self.active:
+            self.canvas.itemconfigure(item, state='hidden')
+            self.free.append(item)
+        self.active = []
+
 class GameEngine:
-    def __init__(self, canvas, stats):
+    def __init__(self, canvas, stats, apple_count=3):
         self.canvas = canvas
         self.stats = stats
         self.apples = []
         self.running = False
         self.start_time = None
-        self.apple_count = 3  # Number of apples per round
+        self.apple_count = apple_count  # Number of apples per round
+        self.apple_size = 30
+        self.min_distance = 100  # Minimum distance between apples
+        
+        # Canvas items are reused across rounds instead of created and destroyed
+        self.apple_pool = ApplePool(canvas)
+        self.effects = EffectLayer(canvas)
+        self.round_timer = None
+        
+        # Apples bucketed by position so a click only checks its neighbours
+        self.grid = SpatialGrid(self.apple_size * 2)
+        
+        # Pointer precision: clicks, hits and how far from the centre hits land
+        self.clicks = 0
+        self.hits = 0
+        self.hit_errors = deque(maxlen=1000)  # Distance from the centre / apple radius
+        self.hit_times = deque(maxlen=1000)
         
         # Bind canvas click
         self.canvas.bind('<Button-1>', self.handle_click)
@@ -49,16 +155,24 @@ class GameEngine:
     def start(self):
         self.running = True
         self.stats.reset()
+        self.clicks = 0
+        self.hits = 0
+        self.hit_errors.clear()
+        self.hit_times.clear()
         self.start_new_round()
         
     def stop(self):
         self.running = False
+        if self.round_timer is not None:
+            self.canvas.after_cancel(self.round_timer)
+            self.round_timer = None
         self.clear_apples()
+        self.effects.clear()
         
     def clear_apples(self):
-        for apple in self.apples:
-            apple.delete()
+        self.apple_pool.release_all(self.apples)
         self.apples.clear()
+        self.grid.clear()
         
     def get_spawn_area(self):
         # Get canvas dimensions
@@ -75,6 +189,7 @@ class GameEngine:
         )
         
     def start_new_round(self):
+        self.round_timer = None
         if not self.running:
             return
             
@@ -84,45 +199,65 @@ class GameEngine:
         # Get spawn area
         left, top, right, bottom = self.get_spawn_area()
         
-        # Generate apples in random positions
-        for _ in range(self.apple_count):
-            while True:
-                x = random.randint(int(left), int(right))
-                y = random.randint(int(top), int(bottom))
-                
-                # Check if position is far enough from other apples
-                valid_position = True
-                for apple in self.apples:
-                    distance = ((x - apple.x) ** 2 + (y - apple.y) ** 2) ** 0.5
-                    if distance < 100:  # Minimum distance between apples
-                        valid_position = False
-                        break
-                
-                if valid_position:
-                    self.apples.append(Apple(self.canvas, x, y))
-                    break
+        # Generate apples in random positions; on a crowded canvas the spacing
+        # and apple size shrink so the round still fits
+        distance, size = self.get_spacing(right - left, bottom - top)
+        positions = poisson_disk_sample(left, top, right, bottom, distance, self.apple_count)
+        for _ in range(3):
+            if len(positions) >= self.apple_count:
+                break
+            # An unlucky fill; retry a little tighter
+            distance *= 0.9
+            positions = poisson_disk_sample(left, top, right, bottom, distance, self.apple_count)
+        if not positions:
+            # Nothing fit (e.g. the canvas is not laid out yet); an empty round
+            # would never complete, so put one apple in the middle
+            positions = [((left + right) / 2, (top + bottom) / 2)]
+        if len(positions) < self.apple_count:
+            print(f"Only {len(positions)} of {self.apple_count} apples fit on the canvas")
+        
+        if size * 2 != self.grid.cell_size:
+            self.grid = SpatialGrid(size * 2)
+        for x, y in positions:
+            apple = self.apple_pool.acquire(int(x), int(y), size)
+            self.apples.append(apple)
+            self.grid.insert(apple, apple.x, apple.y)
         
         # Show round start message
         self.show_message("Collect all apples!", 2000)
         
+    def get_spacing(self, width, height):
+        """(min distance, apple size) that fit apple_count apples in the spawn area"""
+        # A Poisson-disk fill holds roughly 0.65 / distance^2 points per unit area
+        fit = math.sqrt(0.55 * max(width * height, 1) / max(self.apple_count, 1))
+        distance = min(self.min_distance, fit)
+        size = max(3, min(self.apple_size, int(distance / 2) - 1))
+        return distance, size
+        
     def show_message(self, text, duration=1000):
-        msg = self.canvas.create_text(
+        self.effects.show(
             self.canvas.winfo_width() // 2,
             self.canvas.winfo_height() // 2,
-            text=text,
-            fill=DarkTheme.TEXT,
-            font=("Arial", 24, "bold")
+            text,
+            DarkTheme.TEXT,
+            ("Arial", 24, "bold"),
+            duration
         )
-        self.canvas.after(duration, lambda: self.canvas.delete(msg))
         
     def handle_click(self, event):
         if not self.running or not self.start_time:
             return
             
-        for apple in self.apples[:]:  # Copy list to avoid modification during iteration
+        self.clicks += 1
+        radius = self.grid.cell_size / 2
+        for apple in self.grid.query(event.x, event.y, radius):
             if apple.is_clicked(event.x, event.y):
-                apple.delete()
+                self.apple_pool.release(apple)
                 self.apples.remove(apple)
+                self.grid.remove(apple, apple.x, apple.y)
+                self.hits += 1
+                self.hit_errors.append(math.hypot(event.x - apple.x, event.y - apple.y) / apple.size)
+                self.hit_times.append(time.perf_counter())
                 
                 # Show hit effect
                 self.show_hit_effect(event.x, event.y)
@@ -144,19 +279,23 @@ class GameEngine:
                     )
                     
                     # Start new round after delay
-                    self.canvas.after(2000, self.start_new_round)
+                    self.round_timer = self.canvas.after(2000, self.start_new_round)
                 break
         
     def show_hit_effect(self, x, y):
-        # Create hit effect
-        effect = self.canvas.create_text(
-            x, y,
-            text="✓",
-            fill=DarkTheme.SUCCESS,
-            font=("Arial", 24, "bold")
-        )
-        
-        def fade_out():
-            self.canvas.delete(effect)
+        self.effects.show(x, y, "✓", DarkTheme.SUCCESS, ("Arial", 24, "bold"), 500)
         
-        self.canvas.after(500, fade_out)
\ No newline at end of file
+    def get_metrics(self):
+        """Pointer precision over the session: hit rate, hit error and hit rate over time"""
+        metrics = {
+            'clicks': self.clicks,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.clicks if self.clicks else 0.0,
+            'hit_error': 0.0,
+            'hits_per_second': 0.0
+        }
+        if self.hit_errors:
+            metrics['hit_error'] = float(np.median(self.hit_errors))
+        if len(self.hit_times) > 1:
+            metrics['hits_per_second'] = (len(self.hit_times) - 1) / (self.hit_times[-1] - self.hit_times[0])
+        return metrics
\ No newline at end of file
@@ -0,0 +1,114 @@
+import argparse
+import numpy as np
+from landmark_log import HAND_LEFT, LandmarkRecording
+
+NUM_LANDMARKS = 21
+
+# Landmark indices used by the gesture tests
+THUMB_TIP, THUMB_IP = 4, 3
+FINGER_TIPS = np.array([8, 12, 16, 20])  # Index, Middle, Ring, Pinky
+FINGER_PIPS = FINGER_TIPS - 2
+INDEX_TIP = 8
+
+def finger_extents(landmarks, handedness=None):
+    """How far each finger is past its "extended" threshold, for (N, 21, 3) landmarks.
+
+    Returns (thumb, fingers): thumb is (N,) tip-to-IP distance along x, signed so
+    positive means extended for either hand; fingers is (N, 4) PIP-to-tip height.
+    """
+    landmarks = np.asarray(landmarks)
+    if landmarks.ndim == 2:
+        landmarks = landmarks[None]
+
+    # A right hand's thumb points towards -x when extended, a left hand's towards +x
+    thumb = landmarks[:, THUMB_IP, 0] - landmarks[:, THUMB_TIP, 0]
+    if handedness is not None:
+        handedness = np.broadcast_to(np.asarray(handedness), thumb.shape)
+        thumb = np.where(handedness == HAND_LEFT, -thumb, thumb)
+
+    fingers = landmarks[:, FINGER_PIPS, 1] - landmarks[:, FINGER_TIPS, 1]
+    return thumb, fingers
+
+def _gestures_from_states(states):
+    others_up = states[:, 1:].sum(axis=1)
+    left_click = states[:, 0] & (others_up <= 1)  # Thumb up, others down
+    right_click = (states[:, 3:].sum(axis=1) >= 2) & ~states[:, :2].any(axis=1)  # Last 2-3 fingers up
+    return left_click, right_click
+
+def classify_gestures(landmarks, handedness=None, thumb_margin=0.0, finger_margin=0.0):
+    """Classify a batch of frames.
+
+    Returns (fingers, left_click, right_click) where fingers is an (N, 5) bool
+    array of extended fingers (thumb first). Margins are in the same units as
+    the landmarks; zero reproduces the single-frame tests exactly.
+    """
+    thumb, fingers = finger_extents(landmarks, handedness)
+    states = np.empty((len(thumb), 5), dtype=bool)
+    np.greater(thumb, thumb_margin, out=states[:, 0])
+    np.greater(fingers, finger_margin, out=states[:, 1:])
+    left_click, right_click = _gestures_from_states(states)
+    return states, left_click, right_click
+
+def gesture_accuracy(predicted, labels, valid=None):
+    predicted = np.asarray(predicted, dtype=bool)
+    labels = np.asarray(labels, dtype=bool)
+    if valid is not None:
+        predicted = predicted[valid]
+        labels = labels[valid]
+    if not len(labels):
+        return 0.0
+    return float(np.mean(predicted == labels))
+
+def sweep_thresholds(landmarks, left_labels, right_labels, thumb_margins, finger_margins,
+                     handedness=None, valid=None):
+    """Accuracy for every (thumb_margin, finger_margin) pair.
+
+    Returns an array of shape (len(thumb_margins), len(finger_margins), 2) with
+    left-click and right-click accuracy. Finger extents are computed once and
+    only the threshold comparison is repeated per setting.
+    """
+    thumb, fingers = finger_extents(landmarks, handedness)
+    if valid is not None:
+        valid = np.asarray(valid, dtype=bool)
+        thumb, fingers = thumb[valid], fingers[valid]
+        left_labels = np.asarray(left_labels)[valid]
+        right_labels = np.asarray(right_labels)[valid]
+
+    scores = np.zeros((len(thumb_margins), len(finger_margins), 2))
+    states = np.empty((len(thumb), 5), dtype=bool)
+    for j, finger_margin in enumerate(finger_margins):
+        np.greater(fingers, finger_margin, out=states[:, 1:])
+        for i, thumb_margin in enumerate(thumb_margins):
+            np.greater(thumb, thumb_margin, out=states[:, 0])
+            left_click, right_click = _gestures_from_states(states)
+            scores[i, j, 0] = gesture_accuracy(left_click, left_labels)
+            scores[i, j, 1] = gesture_accuracy(right_click, right_labels)
+    return scores
+
+def main():
+    parser = argparse.ArgumentParser(description="Score gestures over a landmark log")
+    parser.add_argument('recording', help="landmark log written with --record")
+    parser.add_argument('--labels', help=".npy file of (N, 2) bool left/right click labels")
+    parser.add_argument('--margins', type=float, nargs='+', default=[0.0, 0.005, 0.01, 0.02, 0.04],
+                        help="normalized margins to sweep for both thumb and fingers")
+    args = parser.parse_args()
+
+    recording = LandmarkRecording(args.recording)
+    present = recording.hand_present
+    fingers, left_click, right_click = classify_gestures(recording.landmarks, recording.handedness)
+    print(f"{len(recording)} frames, {present.sum()} with a hand")
+    print(f"left click frames: {left_click[present].sum()}, right click frames: {right_click[present].sum()}")
+
+    if args.labels:
+        labels = np.load(args.labels)
+        scores = sweep_thresholds(
+            recording.landmarks, labels[:, 0], labels[:, 1], args.margins, args.margins,
+            handedness=recording.handedness, valid=present
+        )
+        print("thumb  finger  left   right")
+        for i, thumb_margin in enumerate(args.margins):
+            for j, finger_margin in enumerate(args.margins):
+                print(f"{thumb_margin:<6} {finger_margin:<7} {scores[i, j, 0]:.3f}  {scores[i, j, 1]:.3f}")
+
+if __name__ == "__main__":
+    main()
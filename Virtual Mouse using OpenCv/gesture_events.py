@@ -0,0 +1,107 @@
+import math
+import time
+from collections import deque
+import numpy as np
+
+# Turns per-frame gesture flags into mouse button events. Each gesture has its
+# own press/release state machine: a press needs press_frames consecutive
+# matching frames, a release release_frames consecutive non-matching ones, so
+# a single misclassified frame neither clicks nor drops a drag.
+
+class GestureTracker:
+    """Press/release state machine for one gesture.
+
+    In 'hold' mode the button follows the gesture (press on confirmation,
+    release when it ends), which gives clicks, double-clicks and drags. In
+    'click' mode a confirmed gesture emits one click.
+    """
+
+    def __init__(self, button, mode='hold', press_frames=2, release_frames=3, cooldown=0.08):
+        self.button = button
+        self.mode = mode
+        self.press_frames = press_frames
+        self.release_frames = release_frames
+        self.cooldown = cooldown        # Minimum seconds between presses of this gesture
+
+        self.active = False
+        self.count = 0                  # Consecutive frames disagreeing with the current state
+        self.run_start = None           # Capture time of the first frame of that run
+        self.last_press = -math.inf
+
+    def update(self, detected, timestamp):
+        """Feed one frame; returns (events, run_start) with events as (kind, button) tuples"""
+        if detected == self.active:
+            self.count = 0
+            return [], None
+
+        if self.count == 0:
+            self.run_start = timestamp
+        self.count += 1
+
+        if detected:
+            if self.count < self.press_frames or timestamp - self.last_press < self.cooldown:
+                # Not confirmed yet, or still cooling down: a held gesture
+                # presses as soon as the cooldown ends instead of being dropped
+                return [], None
+            self.active = True
+            self.count = 0
+            self.last_press = timestamp
+            kind = 'press' if self.mode == 'hold' else 'click'
+            return [(kind, self.button)], self.run_start
+
+        if self.count < self.release_frames:
+            return [], None
+        self.active = False
+        self.count = 0
+        if self.mode == 'hold':
+            return [('release', self.button)], self.run_start
+        return [], None
+
+    def reset(self):
+        """Return to idle; returns the events needed to let go of a held button"""
+        events = [('release', self.button)] if self.active and self.mode == 'hold' else []
+        self.active = False
+        self.count = 0
+        return events
+
+class GestureEventEngine:
+    """Left gesture holds the left button (click, double-click, drag); right gesture clicks"""
+
+    def __init__(self, press_frames=2, release_frames=3, left_cooldown=0.08, right_cooldown=0.4):
+        self.left = GestureTracker('left', 'hold', press_frames, release_frames, left_cooldown)
+        self.right = GestureTracker('right', 'click', press_frames, release_frames, right_cooldown)
+        # Seconds from the capture of the first frame showing a gesture to its event
+        self.latencies = deque(maxlen=200)
+        self.event_count = 0
+
+    def update(self, left_click, right_click, timestamp, now=None):
+        """Feed one frame's gesture flags (captured at timestamp); returns the events to perform"""
+        if now is None:
+            now = time.perf_counter()
+
+        events = []
+        for tracker, detected in ((self.left, left_click), (self.right, right_click)):
+            tracker_events, run_start = tracker.update(bool(detected), timestamp)
+            for kind, button in tracker_events:
+                if kind != 'release':
+                    self.latencies.append(now - run_start)
+            events.extend(tracker_events)
+        self.event_count += len(events)
+        return events
+
+    def is_held(self, button):
+        tracker = self.left if button == 'left' else self.right
+        return tracker.active and tracker.mode == 'hold'
+
+    def reset(self):
+        return self.left.reset() + self.right.reset()
+
+    def get_metrics(self):
+        if not self.latencies:
+            return {'events': self.event_count, 'gesture_latency_ms': 0.0, 'gesture_latency_p95_ms': 0.0}
+        latencies = np.array(self.latencies) * 1000.0
+        return {
+            'events': self.event_count,
+            'gesture_latency_ms': float(np.median(latencies)),
+            'gesture_latency_p95_ms': float(np.percentile(latencies, 95))
+        }
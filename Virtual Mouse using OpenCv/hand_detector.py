@@ -1,70 +1,231 @@
 import cv2
+import time
 import mediapipe as mp
 import numpy as np
+from gesture_classifier import NUM_LANDMARKS, INDEX_TIP, classify_gestures
+from landmark_log import HAND_UNKNOWN, HAND_LEFT, HAND_RIGHT
+from roi_tracker import RoiHandTracker
+from latency_governor import LatencyGovernor, fit_inference_size
+from hand_tracks import HandTrackManager, extract_landmarks
 
 class HandDetector:
-    def __init__(self, mode=False, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7):
+    def __init__(self, mode=False, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7,
+                 roi_tracking=False, latency_budget_ms=None):
         self.mode = mode
         self.max_hands = max_hands
         self.detection_confidence = detection_confidence
         self.tracking_confidence = tracking_confidence
 
+        self.model_complexity = 1
+        self.inference_size = None  # (w, h) to downscale frames to before inference
+
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        self.hands = self._create_hands()
+        self.results = None
+
+        # Crop inference to the area around the last hand when enabled
+        self.roi_tracker = RoiHandTracker(self.hands, self._create_hands) if roi_tracking else None
+
+        # Optional LandmarkRecorder that logs every processed frame
+        self.recorder = None
+        # Optional StageTimer charged with 'color' and 'inference'
+        self.stage_timer = None
+
+        # Trade inference resolution, model size and frame rate for latency
+        self.governor = None
+        if latency_budget_ms:
+            self.governor = LatencyGovernor(latency_budget_ms, on_change=self.configure,
+                                            name="HandDetector governor")
+            self.configure(self.governor.settings)
+
+        # Preallocated landmark buffers, refilled in place every frame
+        self.landmarks_norm = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.landmarks_px = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.points = np.zeros((NUM_LANDMARKS, 2), dtype=np.int32)
+        # (hand index, width, height) currently held in landmarks_px, so drawing
+        # and the gesture step share one conversion per frame
+        self.landmarks_key = None
+        self.connections = np.array(sorted(self.mp_hands.HAND_CONNECTIONS), dtype=np.intp)
+
+        # With several hands, detections keep stable IDs across frames
+        self.tracks = None
+        if max_hands > 1:
+            # Unsmoothed like the single-hand path: the pointer filter smooths both
+            self.tracks = HandTrackManager(max_hands, smoothing=1.0)
+            self.hands_norm = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+            self.hands_handedness = np.zeros(max_hands, dtype=np.int8)
+            self.tracked_px = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+
+    def _create_hands(self):
+        return self.mp_hands.Hands(
             static_image_mode=self.mode,
             max_num_hands=self.max_hands,
+            model_complexity=self.model_complexity,
             min_detection_confidence=self.detection_confidence,
             min_tracking_confidence=self.tracking_confidence
         )
-        self.mp_draw = mp.solutions.drawing_utils
-        
-    def find_hands(self, img, draw=True):
+
+    def configure(self, settings):
+        """Apply a LatencyGovernor level (inference_size, model_complexity)"""
+        self.inference_size = settings['inference_size']
+        if settings['model_complexity'] != self.model_complexity:
+            self.model_complexity = settings['model_complexity']
+            self.hands.close()
+            self.hands = self._create_hands()
+        if self.roi_tracker:
+            self.roi_tracker.set_hands(self.hands)
+            self.roi_tracker.full_frame_size = self.inference_size
+            self.roi_tracker.reset()
+
+    def close(self):
+        self.hands.close()
+        if self.roi_tracker:
+            self.roi_tracker.close()
+
+    def reset_tracking(self):
+        """Forget the ROI and hand tracks, e.g. after the pipeline was paused"""
+        if self.roi_tracker:
+            self.roi_tracker.reset()
+        if self.tracks:
+            self.tracks.reset()
+
+    def _process(self, img):
+        timer = self.stage_timer
+        if self.roi_tracker:
+            results = self.roi_tracker.process(img)
+            # Cropping and colour conversion are not split out on this path
+            if timer:
+                timer.mark('inference')
+            return results
+
+        if self.inference_size and img.shape[1] > self.inference_size[0]:
+            img = cv2.resize(img, fit_inference_size(img, self.inference_size))
         img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(img_rgb)
-        
-        if self.results.multi_hand_landmarks:
-            for hand_landmarks in self.results.multi_hand_landmarks:
-                if draw:
-                    self.mp_draw.draw_landmarks(
-                        img, 
-                        hand_landmarks, 
-                        self.mp_hands.HAND_CONNECTIONS
-                    )
+        if timer:
+            timer.mark('color')
+        results = self.hands.process(img_rgb)
+        if timer:
+            timer.mark('inference')
+        return results
+
+    def find_hands(self, img, draw=True, timestamp=None):
+        """Detect hands in a BGR frame; timestamp is its capture time, for the recorder"""
+        # Frames dropped by the governor reuse the last (normalized) result
+        skip = self.governor and self.results is not None and not self.governor.should_process()
+        if not skip:
+            start = time.perf_counter()
+            self.results = self._process(img)
+            self.landmarks_key = None
+            if self.governor:
+                self.governor.record(time.perf_counter() - start)
+
+            if self.recorder:
+                self.recorder.record_results(self.results.multi_hand_landmarks, self.results.multi_handedness,
+                                             timestamp)
+
+            if self.tracks:
+                count = extract_landmarks(self.results.multi_hand_landmarks, self.results.multi_handedness,
+                                          self.hands_norm, self.hands_handedness)
+                self.tracks.update(self.hands_norm[:count], self.hands_handedness[:count], time.perf_counter())
+
+        if self.results.multi_hand_landmarks and draw:
+            # Last hand first, so the buffer is left holding hand 0 for find_landmarks
+            for hand_index in reversed(range(len(self.results.multi_hand_landmarks))):
+                self.draw_landmarks(img, self.find_landmarks(img, hand_index))
         return img
-    
+
+    def find_landmarks(self, img, hand_index=0):
+        """Fill and return the (21, 3) pixel-space landmark array, or None when no hand is found"""
+        if not self.results or not self.results.multi_hand_landmarks:
+            return None
+        if hand_index >= len(self.results.multi_hand_landmarks):
+            return None
+
+        height, width = img.shape[:2]
+        key = (hand_index, width, height)
+        if key == self.landmarks_key:
+            return self.landmarks_px
+
+        hand = self.results.multi_hand_landmarks[hand_index]
+        landmarks = self.landmarks_norm
+        for i, landmark in enumerate(hand.landmark):
+            landmarks[i, 0] = landmark.x
+            landmarks[i, 1] = landmark.y
+            landmarks[i, 2] = landmark.z
+
+        # z shares the x scale in MediaPipe's normalized space
+        np.multiply(landmarks, (width, height, width), out=self.landmarks_px)
+        self.landmarks_key = key
+        return self.landmarks_px
+
+    def find_tracked_hands(self, img):
+        """(ids, handedness, landmarks) of the tracked hands, oldest first, with (K, 21, 3) pixel-space landmarks.
+
+        Requires max_hands > 1. The arrays are reused on the next call.
+        """
+        ids, handedness, landmarks = self.tracks.stacked()
+        height, width = img.shape[:2]
+        pixels = self.tracked_px[:len(ids)]
+        np.multiply(landmarks, (width, height, width), out=pixels)
+        return ids, handedness, pixels
+
     def find_position(self, img):
-        landmark_list = []
-        if self.results.multi_hand_landmarks:
-            hand = self.results.multi_hand_landmarks[0]
-            for id, landmark in enumerate(hand.landmark):
-                height, width, _ = img.shape
-                cx, cy = int(landmark.x * width), int(landmark.y * height)
-                landmark_list.append([id, cx, cy])
-        return landmark_list
-    
-    def get_gesture_state(self, landmark_list):
-        if len(landmark_list) == 0:
+        """Legacy [id, x, y] list form of find_landmarks"""
+        landmarks = self.find_landmarks(img)
+        if landmarks is None:
+            return []
+        return [[id, int(x), int(y)] for id, (x, y, _) in enumerate(landmarks)]
+
+    def get_handedness(self, hand_index=0):
+        """Handedness code (see landmark_log) of a detected hand"""
+        if not self.results or not self.results.multi_handedness:
+            return HAND_UNKNOWN
+        if hand_index >= len(self.results.multi_handedness):
+            return HAND_UNKNOWN
+        label = self.results.multi_handedness[hand_index].classification[0].label
+        return HAND_LEFT if label == 'Left' else HAND_RIGHT
+
+    def draw_landmarks(self, img, landmarks):
+        if landmarks is None:
+            return img
+        np.copyto(self.points, landmarks[:, :2], casting='unsafe')
+
+        # One polyline call for all bones, then the joints on top
+        cv2.polylines(img, self.points[self.connections], False, (224, 224, 224), 2)
+        for x, y in self.points.tolist():
+            cv2.circle(img, (x, y), 3, (0, 0, 255), cv2.FILLED)
+        return img
+
+    def get_gesture_state(self, landmarks, handedness=None):
+        if landmarks is None or len(landmarks) < NUM_LANDMARKS:
             return False, False, None
-            
-        # Get finger states
-        fingers = []
-        if len(landmark_list) >= 21:  
-            # Thumb (compare tip with pip)
-            if landmark_list[4][1] < landmark_list[3][1]:  # For right hand
-                fingers.append(1)
-            else:
-                fingers.append(0)
-            
-            # Other fingers (compare tip with pip)
-            for tip in range(8, 21, 4):  # Index: 8, Middle: 12, Ring: 16, Pinky: 20
-                if landmark_list[tip][2] < landmark_list[tip-2][2]:
-                    fingers.append(1)
-                else:
-                    fingers.append(0)
-                    
-        # Detect gestures
-        thumb_up = fingers[0] == 1 and sum(fingers[1:]) <= 1  # Thumb up, others down
-        last_fingers_up = sum(fingers[3:]) >= 2 and sum(fingers[:2]) == 0  # Last 2-3 fingers up
-        
+        # The legacy find_position list also gets its [id, x, y] index tip back
+        index_finger = landmarks[INDEX_TIP]
+        if isinstance(landmarks, list):
+            landmarks = np.asarray(landmarks, dtype=np.float32)[:, 1:]
+
+        # Single-frame case of the batch classifier; without handedness the
+        # thumb test assumes a right hand
+        _, left_click, right_click = classify_gestures(landmarks, handedness)
+
         # Return gesture states and index finger position
-        return thumb_up, last_fingers_up, landmark_list[8] if len(landmark_list) >= 9 else None
\ No newline at end of file
+        return bool(left_click[0]), bool(right_click[0]), index_finger
+
+    def get_tracked_gesture_state(self, img):
+        """Two-handed form of get_gesture_state: returns (pointer landmarks, left, right, index tip).
+
+        The oldest tracked hand points; a click gesture from any tracked hand
+        clicks, so one hand can keep pointing while the other clicks.
+        """
+        ids, handedness, landmarks = self.find_tracked_hands(img)
+        if not len(ids):
+            return None, False, False, None
+        _, left_click, right_click = classify_gestures(landmarks, handedness)
+        return landmarks[0], bool(left_click.any()), bool(right_click.any()), landmarks[0, INDEX_TIP]
+
+    def find_gesture_state(self, img):
+        """Landmarks and gesture state for the frame last passed to find_hands"""
+        if self.tracks:
+            return self.get_tracked_gesture_state(img)
+        landmarks = self.find_landmarks(img)
+        return (landmarks,) + self.get_gesture_state(landmarks, self.get_handedness())
@@ -0,0 +1,330 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from gesture_classifier import INDEX_TIP
+from hand_detector import HandDetector
+from landmark_log import LandmarkRecorder
+
+class TrackingResult:
+    """One processed frame: the annotated preview plus detected gesture state"""
+
+    def __init__(self, sequence, capture_time, frame, landmarks,
+                 left_click, right_click, index_finger, inference_time):
+        self.sequence = sequence
+        self.capture_time = capture_time
+        self.frame = frame
+        # (21, 3) pixel-space landmarks owned by this result, or None
+        self.landmarks = landmarks
+        self.left_click = left_click
+        self.right_click = right_click
+        self.index_finger = index_finger
+        self.inference_time = inference_time
+        self.result_time = time.perf_counter()
+
+def _publish_latest(results, result):
+    # Single producer, so dropping the unread result always frees the slot
+    try:
+        results.get_nowait()
+    except queue.Empty:
+        pass
+    results.put_nowait(result)
+
+class InferenceWorker:
+    """Runs hand detection on a background thread, fed by a CaptureThread"""
+
+    def __init__(self, capture, detector=None, on_result=None, stage_timer=None):
+        self.capture = capture
+        self.detector = detector or HandDetector()
+        self.on_result = on_result
+        # Optional StageTimer; the detector charges 'color' and 'inference' to it
+        self.stage_timer = stage_timer
+        self.detector.stage_timer = stage_timer
+        self.results = queue.Queue(maxsize=1)
+        self.thread = None
+        self.running = False
+        self.frames_processed = 0
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="InferenceWorker", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def reset(self):
+        """Drop the detector's ROI and track state before resuming"""
+        self.detector.reset_tracking()
+
+    def _run(self):
+        while self.running:
+            item = self.capture.read(timeout=0.1)
+            if item is None:
+                continue
+
+            sequence, capture_time, frame = item
+            start = time.perf_counter()
+            timer = self.stage_timer
+            if timer:
+                timer.begin()
+                # Age of the frame when the worker picks it up
+                timer.add('capture', start - capture_time)
+            try:
+                frame = self.detector.find_hands(frame, timestamp=capture_time)
+                landmarks, left_click, right_click, index_finger = self.detector.find_gesture_state(frame)
+                # The detector reuses its buffers, so the published result keeps a copy
+                if landmarks is not None:
+                    landmarks = landmarks.copy()
+                    index_finger = landmarks[INDEX_TIP]
+            except Exception as e:
+                print(f"Inference error: {e}")
+                # Close the frame so its capture and failed-stage time still get exported
+                if timer:
+                    timer.mark('gesture')
+                    timer.end_frame()
+                continue
+            if timer:
+                timer.mark('gesture')
+
+            result = TrackingResult(
+                sequence, capture_time, frame, landmarks,
+                left_click, right_click, index_finger,
+                time.perf_counter() - start
+            )
+            self.frames_processed += 1
+
+            # Pointer output is driven here, at inference rate, not by the UI loop
+            if self.on_result:
+                self.on_result(result)
+            if timer:
+                timer.mark('output')
+                timer.end_frame()
+            _publish_latest(self.results, result)
+
+    def get_latest(self):
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+def _detector_process(shm_name, shape, tasks, results, detector_kwargs, record_path):
+    # Runs in a child process: frames arrive through shared memory, only
+    # slot numbers and landmark data cross the process boundary
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame_bytes = int(np.prod(shape))
+    detector = HandDetector(**detector_kwargs)
+
+    # Dummy inference builds the graph before real frames arrive
+    detector.find_hands(np.zeros(shape, dtype=np.uint8), draw=False)
+    results.put(None)
+
+    if record_path:
+        detector.recorder = LandmarkRecorder(record_path)
+    frame = None
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            if task == 'reset':
+                detector.reset_tracking()
+                continue
+
+            slot, sequence, capture_time = task
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * frame_bytes)
+            start = time.perf_counter()
+            try:
+                # Landmarks are drawn straight into the shared frame
+                detector.find_hands(frame, timestamp=capture_time)
+                landmarks, left_click, right_click, index_finger = detector.find_gesture_state(frame)
+            except Exception as e:
+                print(f"Inference error: {e}")
+                landmarks, left_click, right_click, index_finger = None, False, False, None
+
+            results.put((
+                slot, sequence, capture_time, landmarks,
+                left_click, right_click, index_finger,
+                time.perf_counter() - start
+            ))
+    finally:
+        del frame
+        shm.close()
+        if detector.recorder:
+            detector.recorder.close()
+
+class ProcessInferenceWorker:
+    """Same interface as InferenceWorker, but MediaPipe runs in a separate process"""
+
+    def __init__(self, capture, on_result=None, slots=2, detector_kwargs=None, record_path=None,
+                 stage_timer=None):
+        self.capture = capture
+        self.record_path = record_path
+        self.on_result = on_result
+        # Optional StageTimer; the child's detection step is charged to 'inference' as a whole
+        self.stage_timer = stage_timer
+        self.slot_count = slots
+        self.detector_kwargs = detector_kwargs or {}
+        self.results = queue.Queue(maxsize=1)
+        self.context = multiprocessing.get_context('spawn')
+
+        self.shm = None
+        self.shape = None
+        self.frame_bytes = 0
+        self.process = None
+        self.tasks = None
+        self.process_results = None
+        self.free_slots = queue.Queue()
+
+        self.feed_thread = None
+        self.collect_thread = None
+        self.running = False
+        self.ready = threading.Event()  # Set once the child has run its warm-up inference
+        self.frames_processed = 0
+        self.frames_skipped = 0
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.feed_thread = threading.Thread(target=self._feed, name="InferenceFeeder", daemon=True)
+        self.collect_thread = threading.Thread(target=self._collect, name="InferenceCollector", daemon=True)
+        self.feed_thread.start()
+        self.collect_thread.start()
+        return self
+
+    def _start_process(self, shape):
+        # Shared memory is sized from the first frame we see
+        self.shape = shape
+        self.frame_bytes = int(np.prod(shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=self.frame_bytes * self.slot_count)
+        for slot in range(self.slot_count):
+            self.free_slots.put(slot)
+
+        self.tasks = self.context.Queue()
+        self.process_results = self.context.Queue()
+        self.process = self.context.Process(
+            target=_detector_process,
+            args=(self.shm.name, shape, self.tasks, self.process_results,
+                  self.detector_kwargs, self.record_path),
+            daemon=True
+        )
+        self.process.start()
+
+    def prewarm(self, shape, timeout=30.0):
+        """Start the worker and detector process for frames of this shape and wait for its warm-up"""
+        self.start()
+        if self.process is None:
+            self._start_process(shape)
+        deadline = time.perf_counter() + timeout
+        # Give up early if the child dies during start-up
+        while not self.ready.wait(0.1):
+            if not self.process.is_alive() or time.perf_counter() > deadline:
+                return False
+        return True
+
+    def reset(self):
+        """Drop the child detector's ROI and track state before resuming"""
+        if self.process:
+            # Queued ahead of any frame fed after the resume
+            self.tasks.put('reset')
+
+    def _slot_view(self, slot):
+        return np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.frame_bytes)
+
+    def _feed(self):
+        while self.running:
+            item = self.capture.read(timeout=0.1)
+            if item is None:
+                continue
+
+            sequence, capture_time, frame = item
+            if self.process is None:
+                self._start_process(frame.shape)
+            if frame.shape != self.shape:
+                self.frames_skipped += 1
+                continue
+
+            # Both slots busy means the child is behind; drop rather than queue up
+            try:
+                slot = self.free_slots.get_nowait()
+            except queue.Empty:
+                self.frames_skipped += 1
+                continue
+
+            self._slot_view(slot)[:] = frame
+            self.tasks.put((slot, sequence, capture_time))
+
+    def _collect(self):
+        while self.running:
+            if self.process_results is None:
+                time.sleep(0.01)
+                continue
+            try:
+                data = self.process_results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if data is None:
+                self.ready.set()
+                continue
+
+            slot, sequence, capture_time, landmarks, left_click, right_click, index_finger, inference_time = data
+            timer = self.stage_timer
+            if timer:
+                timer.begin()
+                # Everything between capture and collection except detection
+                # itself: feed queueing, slot copy and IPC
+                timer.add('capture', time.perf_counter() - capture_time - inference_time)
+                timer.add('inference', inference_time)
+            frame = self._slot_view(slot).copy()
+            self.free_slots.put(slot)
+
+            result = TrackingResult(
+                sequence, capture_time, frame, landmarks,
+                left_click, right_click, index_finger, inference_time
+            )
+            self.frames_processed += 1
+
+            if self.on_result:
+                self.on_result(result)
+            if timer:
+                timer.mark('output')
+                timer.end_frame()
+            _publish_latest(self.results, result)
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        for thread in (self.feed_thread, self.collect_thread):
+            if thread and thread is not threading.current_thread():
+                thread.join(timeout)
+        self.feed_thread = None
+        self.collect_thread = None
+
+        if self.process:
+            self.tasks.put(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+
+        if self.shm:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+        self.free_slots = queue.Queue()
+
+    def get_latest(self):
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
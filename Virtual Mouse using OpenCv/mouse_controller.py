@@ -1,22 +1,27 @@
-import pyautogui
 import numpy as np
-from time import sleep
+import time
+from pointer_filters import EmaFilter
+from pointer_backends import AsyncPointerDispatcher, PyAutoGuiBackend
 
 class MouseController:
-    def __init__(self, smoothing=0.5, screen_margin=50):
+    def __init__(self, smoothing=0.5, screen_margin=50, pointer_filter=None, predictor=None, backend=None):
         self.prev_x = 0
         self.prev_y = 0
         self.smoothing = smoothing
         self.screen_margin = screen_margin
+        # Any pointer_filters filter; the default keeps the old blend, but time-based
+        self.pointer_filter = pointer_filter or EmaFilter(smoothing)
+        # Optional LatencyPredictor that leads the cursor by the pipeline delay
+        self.predictor = predictor
         self.last_click_time = 0
-        self.click_cooldown = 0.5  # Seconds between clicks
+        self.click_cooldown = 0.5  # Seconds between clicks (legacy left_click/right_click only)
+        self.held_buttons = set()
         
-        # Configure PyAutoGUI
-        pyautogui.FAILSAFE = False  # We'll implement our own safety checks
-        pyautogui.PAUSE = 0.01      # Reduce delay between commands
+        # Pointer output runs on its own thread; moves never block the caller
+        self.backend = backend or AsyncPointerDispatcher(PyAutoGuiBackend())
         
         # Get screen dimensions
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = self.backend.size()
         
         # Define safe boundaries
         self.min_x = self.screen_margin
@@ -24,24 +29,85 @@ class MouseController:
         self.min_y = self.screen_margin
         self.max_y = self.screen_height - self.screen_margin
         
-    def move(self, x, y, smooth=True):
+    def move(self, x, y, smooth=True, timestamp=None):
         # Ensure coordinates are within safe boundaries
-        x = np.clip(x, self.min_x, self.max_x)
-        y = np.clip(y, self.min_y, self.max_y)
+        x = float(np.clip(x, self.min_x, self.max_x))
+        y = float(np.clip(y, self.min_y, self.max_y))
         
         if smooth:
-            # Apply smoothing
-            x = int(x * self.smoothing + self.prev_x * (1 - self.smoothing))
-            y = int(y * self.smoothing + self.prev_y * (1 - self.smoothing))
+            # Filter in float screen space using when the frame was captured
+            if timestamp is None:
+                timestamp = time.perf_counter()
+            x, y = self.pointer_filter.filter(x, y, timestamp)
         
+        if self.predictor and timestamp is not None:
+            x, y = self.predictor.predict(x, y, timestamp)
+            x = float(np.clip(x, self.min_x, self.max_x))
+            y = float(np.clip(y, self.min_y, self.max_y))
+        
+        x, y = int(round(x)), int(round(y))
         try:
-            pyautogui.moveTo(x, y)
+            self.backend.move_to(x, y)
             self.prev_x, self.prev_y = x, y
         except Exception as e:
             print(f"Mouse movement error: {e}")
     
+    def reset(self):
+        # Forget filter and prediction history, e.g. when tracking resumes
+        self.pointer_filter.reset()
+        if self.predictor:
+            self.predictor.reset()
+    
+    def get_metrics(self):
+        if self.predictor:
+            return self.predictor.get_metrics()
+        return {}
+    
+    def in_bounds(self):
+        return (self.min_x < self.prev_x < self.max_x and
+                self.min_y < self.prev_y < self.max_y)
+    
+    def press(self, button):
+        try:
+            if self.in_bounds() and button not in self.held_buttons:
+                self.backend.press(button)
+                self.held_buttons.add(button)
+                return True
+        except Exception as e:
+            print(f"Mouse press error: {e}")
+        return False
+    
+    def release(self, button):
+        # Releases are never bounds-checked so a button cannot stay stuck down
+        try:
+            if button in self.held_buttons:
+                self.held_buttons.discard(button)
+                self.backend.release(button)
+                return True
+        except Exception as e:
+            print(f"Mouse release error: {e}")
+        return False
+    
+    def click(self, button):
+        try:
+            if self.in_bounds():
+                self.backend.click(button)
+                return True
+        except Exception as e:
+            print(f"Mouse click error: {e}")
+        return False
+    
+    def perform(self, events):
+        """Carry out (kind, button) events from a GestureEventEngine; returns those that took effect"""
+        actions = {'press': self.press, 'release': self.release, 'click': self.click}
+        return [(kind, button) for kind, button in events if actions[kind](button)]
+    
+    def release_all(self):
+        for button in list(self.held_buttons):
+            self.release(button)
+    
     def can_click(self):
-        current_time = pyautogui.time.time()
+        current_time = time.time()
         if current_time - self.last_click_time >= self.click_cooldown:
             self.last_click_time = current_time
             return True
@@ -52,7 +118,7 @@ class MouseController:
             if (self.min_x < self.prev_x < self.max_x and 
                 self.min_y < self.prev_y < self.max_y and 
                 self.can_click()):
-                pyautogui.click(button='left')
+                self.backend.click('left')
                 return True
         except Exception as e:
             print(f"Left click error: {e}")
@@ -63,14 +129,21 @@ class MouseController:
             if (self.min_x < self.prev_x < self.max_x and 
                 self.min_y < self.prev_y < self.max_y and 
                 self.can_click()):
-                pyautogui.click(button='right')
+                self.backend.click('right')
                 return True
         except Exception as e:
             print(f"Right click error: {e}")
         return False
             
+    def close(self):
+        # Sends anything still queued and stops the dispatcher thread
+        self.release_all()
+        if hasattr(self.backend, 'close'):
+            self.backend.close()
+            
     def map_coordinates(self, x, y, input_width, input_height):
         """Map coordinates from input space (e.g., webcam) to screen space"""
         screen_x = np.interp(x, [0, input_width], [self.min_x, self.max_x])
         screen_y = np.interp(y, [0, input_height], [self.min_y, self.max_y])
-        return int(screen_x), int(screen_y)
\ No newline at end of file
+        # Kept as floats so the pointer filter sees sub-pixel motion
+        return float(screen_x), float(screen_y)
\ No newline at end of file
@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import deque
+
+# Pointer output backends. Every backend provides size(), move_to(x, y),
+# click(button), press(button) and release(button); buttons are 'left',
+# 'middle' or 'right'.
+
+class PyAutoGuiBackend:
+    """Portable output through PyAutoGUI (sleeps PAUSE seconds after every call)"""
+
+    def __init__(self, pause=0.01):
+        import pyautogui
+        self.pyautogui = pyautogui
+        pyautogui.FAILSAFE = False  # MouseController implements its own safety checks
+        pyautogui.PAUSE = pause
+
+    def size(self):
+        return self.pyautogui.size()
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def click(self, button):
+        self.pyautogui.click(button=button)
+
+    def press(self, button):
+        self.pyautogui.mouseDown(button=button)
+
+    def release(self, button):
+        self.pyautogui.mouseUp(button=button)
+
+class XlibBackend:
+    """Injects events straight into the X server through the XTEST extension"""
+
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+
+    def __init__(self, display=None):
+        try:
+            from Xlib import X, display as xdisplay
+            from Xlib.ext import xtest
+        except ImportError as e:
+            raise ImportError("XlibBackend requires python-xlib (pip install python-xlib)") from e
+
+        self.X = X
+        self.xtest = xtest
+        self.display = xdisplay.Display(display)
+        if not self.display.has_extension('XTEST'):
+            raise RuntimeError("X server does not support the XTEST extension")
+        self.screen = self.display.screen()
+
+    def size(self):
+        return self.screen.width_in_pixels, self.screen.height_in_pixels
+
+    def move_to(self, x, y):
+        self.xtest.fake_input(self.display, self.X.MotionNotify, x=int(x), y=int(y))
+        self.display.flush()
+
+    def press(self, button):
+        self.xtest.fake_input(self.display, self.X.ButtonPress, self.BUTTONS[button])
+        self.display.flush()
+
+    def release(self, button):
+        self.xtest.fake_input(self.display, self.X.ButtonRelease, self.BUTTONS[button])
+        self.display.flush()
+
+    def click(self, button):
+        self.press(button)
+        self.release(button)
+
+class NullBackend:
+    """Discards output; for headless runs and benchmarks"""
+
+    def __init__(self, size=(1920, 1080)):
+        self.screen_size = size
+        self.event_count = 0
+
+    def size(self):
+        return self.screen_size
+
+    def move_to(self, x, y):
+        self.event_count += 1
+
+    def click(self, button):
+        self.event_count += 1
+
+    def press(self, button):
+        self.event_count += 1
+
+    def release(self, button):
+        self.event_count += 1
+
+class RecordingBackend(NullBackend):
+    """Keeps every event as (time, kind, args) for tests and offline analysis"""
+
+    def __init__(self, size=(1920, 1080)):
+        super().__init__(size)
+        self.events = []
+
+    def move_to(self, x, y):
+        super().move_to(x, y)
+        self.events.append((time.perf_counter(), 'move', (x, y)))
+
+    def click(self, button):
+        super().click(button)
+        self.events.append((time.perf_counter(), 'click', (button,)))
+
+    def press(self, button):
+        super().press(button)
+        self.events.append((time.perf_counter(), 'press', (button,)))
+
+    def release(self, button):
+        super().release(button)
+        self.events.append((time.perf_counter(), 'release', (button,)))
+
+class AsyncPointerDispatcher:
+    """Runs a backend on its own thread so callers never wait on pointer output.
+
+    Moves that have not been sent yet collapse into the newest position; clicks,
+    presses and releases are never merged and keep their order relative to moves.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.events = deque()
+        self.condition = threading.Condition()
+        self.busy = False
+        self.running = True
+
+        self.events_dispatched = 0
+        self.moves_coalesced = 0
+
+        self.thread = threading.Thread(target=self._run, name="PointerDispatcher", daemon=True)
+        self.thread.start()
+
+    def size(self):
+        return self.backend.size()
+
+    def _post(self, kind, *args):
+        with self.condition:
+            self.events.append((kind, args))
+            self.condition.notify()
+
+    def move_to(self, x, y):
+        with self.condition:
+            # Only the trailing event may be replaced, so ordering with clicks holds
+            if self.events and self.events[-1][0] == 'move':
+                self.events[-1] = ('move', (x, y))
+                self.moves_coalesced += 1
+            else:
+                self.events.append(('move', (x, y)))
+            self.condition.notify()
+
+    def click(self, button):
+        self._post('click', button)
+
+    def press(self, button):
+        self._post('press', button)
+
+    def release(self, button):
+        self._post('release', button)
+
+    def _run(self):
+        handlers = {
+            'move': self.backend.move_to,
+            'click': self.backend.click,
+            'press': self.backend.press,
+            'release': self.backend.release
+        }
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.events or not self.running)
+                if not self.events:
+                    return
+                kind, args = self.events.popleft()
+                self.busy = True
+
+            try:
+                handlers[kind](*args)
+            except Exception as e:
+                print(f"Pointer output error: {e}")
+
+            with self.condition:
+                self.busy = False
+                self.events_dispatched += 1
+                self.condition.notify_all()
+
+    def flush(self, timeout=1.0):
+        """Wait until every queued event has been sent"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.events and not self.busy, timeout)
+
+    def close(self, timeout=1.0):
+        self.flush(timeout)
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+BACKENDS = {
+    'pyautogui': PyAutoGuiBackend,
+    'xlib': XlibBackend,
+    'null': NullBackend
+}
+
+def make_backend(name, asynchronous=True):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown pointer backend '{name}', expected one of {sorted(BACKENDS)}")
+    backend = BACKENDS[name]()
+    return AsyncPointerDispatcher(backend) if asynchronous else backend
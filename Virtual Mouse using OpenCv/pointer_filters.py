@@ -0,0 +1,141 @@
+import math
+from abc import ABC, abstractmethod
+
+# Pointer smoothing filters. All of them take real timestamps (seconds), so
+# their behaviour does not change with the camera or inference frame rate.
+
+class PointerFilter(ABC):
+    # Samples further apart than this restart the filter instead of blending
+    max_gap = 0.5
+
+    def __init__(self):
+        self.last_time = None
+
+    def reset(self):
+        self.last_time = None
+
+    def filter(self, x, y, timestamp):
+        if self.last_time is None or timestamp - self.last_time > self.max_gap:
+            self.start(x, y)
+            self.last_time = timestamp
+            return x, y
+
+        dt = max(timestamp - self.last_time, 1e-4)
+        self.last_time = timestamp
+        return self.update(x, y, dt)
+
+    @abstractmethod
+    def start(self, x, y):
+        """Restart the filter at (x, y)"""
+
+    @abstractmethod
+    def update(self, x, y, dt):
+        """Filtered position for a sample dt seconds after the previous one"""
+
+class EmaFilter(PointerFilter):
+    """Exponential blend; smoothing is the weight given to a new sample at reference_rate"""
+
+    def __init__(self, smoothing=0.5, reference_rate=30.0):
+        super().__init__()
+        self.smoothing = smoothing
+        self.reference_rate = reference_rate
+        self.x = self.y = 0.0
+
+    def start(self, x, y):
+        self.x, self.y = x, y
+
+    def update(self, x, y, dt):
+        # Same decay per second regardless of how often we are called
+        alpha = 1.0 - (1.0 - self.smoothing) ** (dt * self.reference_rate)
+        self.x += (x - self.x) * alpha
+        self.y += (y - self.y) * alpha
+        return self.x, self.y
+
+def _smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+class OneEuroFilter(PointerFilter):
+    """Speed-adaptive low-pass filter (Casiez et al.): heavy smoothing at rest, little lag when moving"""
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = self.y = 0.0
+        self.dx = self.dy = 0.0
+
+    def start(self, x, y):
+        self.x, self.y = x, y
+        self.dx = self.dy = 0.0
+
+    def update(self, x, y, dt):
+        # Smoothed speed drives the position cutoff
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        self.dx += ((x - self.x) / dt - self.dx) * a_d
+        self.dy += ((y - self.y) / dt - self.dy) * a_d
+
+        speed = math.hypot(self.dx, self.dy)
+        a = _smoothing_factor(dt, self.min_cutoff + self.beta * speed)
+        self.x += (x - self.x) * a
+        self.y += (y - self.y) * a
+        return self.x, self.y
+
+class _KalmanAxis:
+    # Constant-velocity model for one axis: state (position, velocity)
+    def __init__(self, position):
+        self.p = position
+        self.v = 0.0
+        self.P = [[1e3, 0.0], [0.0, 1e3]]
+
+    def step(self, z, dt, q, r):
+        # Predict
+        p = self.p + self.v * dt
+        (a, b), (c, d) = self.P
+        dt2 = dt * dt
+        a, b, c, d = (
+            a + dt * (b + c) + dt2 * d + q * dt2 * dt2 / 4,
+            b + dt * d + q * dt2 * dt / 2,
+            c + dt * d + q * dt2 * dt / 2,
+            d + q * dt2
+        )
+
+        # Update with the measured position
+        s = a + r
+        k0, k1 = a / s, c / s
+        residual = z - p
+        self.p = p + k0 * residual
+        self.v = self.v + k1 * residual
+        self.P = [[(1 - k0) * a, (1 - k0) * b], [c - k1 * a, d - k1 * b]]
+        return self.p
+
+class KalmanFilter(PointerFilter):
+    """Constant-velocity Kalman filter; process_noise is acceleration variance in px^2/s^4"""
+
+    def __init__(self, process_noise=5e5, measurement_noise=25.0):
+        super().__init__()
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.axes = None
+
+    def start(self, x, y):
+        self.axes = (_KalmanAxis(x), _KalmanAxis(y))
+
+    def update(self, x, y, dt):
+        ax, ay = self.axes
+        return (
+            ax.step(x, dt, self.process_noise, self.measurement_noise),
+            ay.step(y, dt, self.process_noise, self.measurement_noise)
+        )
+
+FILTERS = {
+    'ema': EmaFilter,
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanFilter
+}
+
+def make_filter(name, **params):
+    if name not in FILTERS:
+        raise ValueError(f"Unknown pointer filter '{name}', expected one of {sorted(FILTERS)}")
+    return FILTERS[name](**params)
@@ -0,0 +1,89 @@
+import cv2
+import time
+from collections import deque
+import numpy as np
+from PIL import Image, ImageTk
+
+class PreviewRenderer:
+    """Shows frames in a Tk label through one persistent PhotoImage updated in place"""
+
+    def __init__(self, label, fps=15, container=None):
+        self.label = label
+        self.interval_ms = max(1, int(1000 / fps))
+        self.visible = True
+
+        # Area of the label's container, tracked from <Configure> instead of
+        # polling winfo_* every frame
+        self.area = (0, 0)
+        self.size = None
+
+        # Persistent buffers: resized BGR frame, RGBA pixels shared with a PIL image
+        self.resized = None
+        self.rgba = None
+        self.image = None
+        self.photo = None
+
+        self.update_times = deque(maxlen=300)
+        (container or label.master).bind('<Configure>', self._on_configure)
+
+    def _on_configure(self, event):
+        self.area = (event.width, event.height)
+
+    def _fit(self, frame_w, frame_h):
+        # Fit the frame inside the label while keeping the aspect ratio
+        area_w, area_h = self.area
+        if area_w <= 1 or area_h <= 1:
+            area_w, area_h = frame_w, frame_h
+        scale = min(area_w / frame_w, area_h / frame_h)
+        return max(1, int(frame_w * scale)), max(1, int(frame_h * scale))
+
+    def _allocate(self, size):
+        width, height = size
+        self.size = size
+        self.resized = np.empty((height, width, 3), dtype=np.uint8)
+        self.rgba = np.empty((height, width, 4), dtype=np.uint8)
+        # RGBA buffers are mapped by PIL rather than copied, so the image
+        # always reflects the current contents of self.rgba
+        self.image = Image.frombuffer('RGBA', size, self.rgba, 'raw', 'RGBA', 0, 1)
+        self.photo = ImageTk.PhotoImage('RGBA', size)
+        self.label.configure(image=self.photo)
+        self.label.imgtk = self.photo
+
+    def set_visible(self, visible):
+        self.visible = visible
+        if not visible:
+            self.label.configure(image='')
+        elif self.photo:
+            self.label.configure(image=self.photo)
+
+    def render(self, frame):
+        # Hidden or minimized previews cost nothing
+        if not self.visible or not self.label.winfo_viewable():
+            return False
+
+        start = time.perf_counter()
+        frame_h, frame_w = frame.shape[:2]
+        size = self._fit(frame_w, frame_h)
+        if size != self.size:
+            self._allocate(size)
+
+        if size == (frame_w, frame_h):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self.rgba)
+        else:
+            cv2.resize(frame, size, dst=self.resized)
+            cv2.cvtColor(self.resized, cv2.COLOR_BGR2RGBA, dst=self.rgba)
+        self.photo.paste(self.image)
+
+        self.update_times.append(time.perf_counter() - start)
+        return True
+
+    def get_stats(self):
+        """UI-thread milliseconds per preview update"""
+        if not self.update_times:
+            return {'updates': 0, 'mean_ms': 0.0, 'p95_ms': 0.0}
+        times = np.array(self.update_times) * 1000.0
+        return {
+            'updates': len(times),
+            'mean_ms': float(times.mean()),
+            'p95_ms': float(np.percentile(times, 95))
+        }
@@ -0,0 +1,145 @@
+import cv2
+import numpy as np
+from latency_governor import fit_inference_size
+
+class RoiHandTracker:
+    """Runs MediaPipe Hands on a crop around the last seen hand.
+
+    Landmarks found in the crop are rewritten to full-frame normalized
+    coordinates, so callers see the same results as a full-frame run. The
+    tracker falls back to full-frame detection whenever the hand is lost,
+    reaches the edge of the crop, or its box jumps away from the last one.
+
+    Crops go through their own Hands instance, made with create_hands: a
+    streaming Hands carries tracking state from frame to frame, which only
+    holds while its input keeps the same geometry.
+    """
+
+    def __init__(self, hands, create_hands, expand=1.8, min_side=0.25, max_side=0.8,
+                 min_iou=0.2, edge_margin=0.02, full_frame_size=None):
+        self.hands = hands                      # Full-frame instance, owned by the caller
+        self.create_hands = create_hands
+        self.crop_hands = create_hands()
+        self.expand = expand                    # Crop side relative to the hand's bounding box
+        self.min_side = min_side                # Crop side limits, as a fraction of the frame's short side
+        self.max_side = max_side
+        self.min_iou = min_iou                  # Overlap a crop result needs with the last hand box
+        self.edge_margin = edge_margin          # Normalized crop margin that counts as "leaving the box"
+        self.full_frame_size = full_frame_size  # Optional (w, h) whose width full-frame detection is downscaled to
+        self.roi = None
+        self.box = None                         # Last hand box, full-frame normalized (x0, y0, x1, y1)
+
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0
+
+    def reset(self):
+        self.roi = None
+        self.box = None
+
+    def set_hands(self, hands):
+        """Use a new full-frame instance, rebuilding the crop one to match its settings"""
+        if hands is self.hands:
+            return
+        self.hands = hands
+        self.crop_hands.close()
+        self.crop_hands = self.create_hands()
+        self.reset()
+
+    def close(self):
+        self.crop_hands.close()
+
+    def process(self, frame):
+        """Detect hands in a BGR frame; returns a MediaPipe Hands result"""
+        height, width = frame.shape[:2]
+
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            # Only the crop is colour-converted
+            crop = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+            results = self.crop_hands.process(crop)
+            if self._inside_crop(results):
+                self._to_frame_coordinates(results, width, height)
+                box = self._box(results)
+                if self._iou(box, self.box) >= self.min_iou:
+                    self.box = box
+                    self.roi = self._roi_from(box, width, height)
+                    self.roi_frames += 1
+                    return results
+            self.fallbacks += 1
+
+        if self.full_frame_size:
+            frame = cv2.resize(frame, fit_inference_size(frame, self.full_frame_size))
+        results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        self.full_frames += 1
+        if results.multi_hand_landmarks:
+            self.box = self._box(results)
+            self.roi = self._roi_from(self.box, width, height)
+        else:
+            self.box = self.roi = None
+        return results
+
+    def _inside_crop(self, results):
+        if not results.multi_hand_landmarks:
+            return False
+
+        # A hand touching the crop border is leaving the box
+        for hand in results.multi_hand_landmarks:
+            for landmark in hand.landmark:
+                if not (self.edge_margin < landmark.x < 1 - self.edge_margin and
+                        self.edge_margin < landmark.y < 1 - self.edge_margin):
+                    return False
+        return True
+
+    def _to_frame_coordinates(self, results, width, height):
+        x0, y0, x1, y1 = self.roi
+        crop_w, crop_h = x1 - x0, y1 - y0
+        for hand in results.multi_hand_landmarks:
+            for landmark in hand.landmark:
+                landmark.x = (x0 + landmark.x * crop_w) / width
+                landmark.y = (y0 + landmark.y * crop_h) / height
+                # z is relative to the image width
+                landmark.z = landmark.z * crop_w / width
+
+    @staticmethod
+    def _box(results):
+        # Normalized box around all detected hands
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    @staticmethod
+    def _iou(a, b):
+        if a is None or b is None:
+            return 0.0
+        w = min(a[2], b[2]) - max(a[0], b[0])
+        h = min(a[3], b[3]) - max(a[1], b[1])
+        if w <= 0 or h <= 0:
+            return 0.0
+        inter = w * h
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+        return inter / union if union > 0 else 0.0
+
+    def _roi_from(self, box, width, height):
+        # Square crop around the hand box, expanded and kept inside the frame
+        min_x, max_x = box[0] * width, box[2] * width
+        min_y, max_y = box[1] * height, box[3] * height
+
+        short_side = min(width, height)
+        side = max(max_x - min_x, max_y - min_y) * self.expand
+        side = int(np.clip(side, self.min_side * short_side, short_side))
+        if side > self.max_side * short_side:
+            # Hand fills most of the frame, cropping would not gain anything
+            return None
+
+        cx, cy = (min_x + max_x) / 2, (min_y + max_y) / 2
+        x0 = int(np.clip(cx - side / 2, 0, width - side))
+        y0 = int(np.clip(cy - side / 2, 0, height - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def get_stats(self):
+        return {
+            'roi_frames': self.roi_frames,
+            'full_frames': self.full_frames,
+            'fallbacks': self.fallbacks
+        }
@@ -0,0 +1,91 @@
+import math
+import random
+
+class SpatialGrid:
+    """Uniform grid of buckets for point items; queries touch only nearby cells"""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, item, x, y):
+        self.cells.setdefault(self._cell(x, y), []).append(item)
+
+    def remove(self, item, x, y):
+        key = self._cell(x, y)
+        bucket = self.cells.get(key)
+        if bucket and item in bucket:
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[key]
+
+    def clear(self):
+        self.cells.clear()
+
+    def query(self, x, y, radius):
+        """Items stored in cells overlapping the square of half-side radius around (x, y)"""
+        x0, y0 = self._cell(x - radius, y - radius)
+        x1, y1 = self._cell(x + radius, y + radius)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield from self.cells.get((cx, cy), ())
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.cells.values())
+
+def poisson_disk_sample(left, top, right, bottom, min_distance, count, attempts=30, rng=random):
+    """Up to count random points at least min_distance apart inside the rectangle.
+
+    Bridson's algorithm on a grid with one point per cell: every candidate is
+    checked against at most 5x5 cells, and each active point gets a fixed
+    number of attempts, so the run time is bounded by the area instead of
+    spinning when the points do not fit. The area is filled and count points
+    are drawn from the result; fewer come back if the area holds fewer.
+    """
+    width, height = right - left, bottom - top
+    if count <= 0 or width < 0 or height < 0:
+        return []
+    if min_distance <= 0 or width == 0 or height == 0:
+        return [(rng.uniform(left, right), rng.uniform(top, bottom)) for _ in range(count)]
+
+    cell = min_distance / math.sqrt(2)
+    columns, rows = int(width / cell) + 1, int(height / cell) + 1
+    grid = [None] * (columns * rows)
+    min_sq = min_distance * min_distance
+
+    def fits(x, y):
+        cx, cy = int(x / cell), int(y / cell)
+        for gy in range(max(cy - 2, 0), min(cy + 3, rows)):
+            for gx in range(max(cx - 2, 0), min(cx + 3, columns)):
+                point = grid[gy * columns + gx]
+                if point and (point[0] - x) ** 2 + (point[1] - y) ** 2 < min_sq:
+                    return False
+        return True
+
+    def add(x, y):
+        grid[int(y / cell) * columns + int(x / cell)] = (x, y)
+        points.append((x, y))
+        active.append((x, y))
+
+    points, active = [], []
+    add(rng.uniform(0, width), rng.uniform(0, height))
+    while active:
+        index = rng.randrange(len(active))
+        px, py = active[index]
+        for _ in range(attempts):
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(min_distance, 2 * min_distance)
+            x, y = px + distance * math.cos(angle), py + distance * math.sin(angle)
+            if 0 <= x <= width and 0 <= y <= height and fits(x, y):
+                add(x, y)
+                break
+        else:
+            # No room left around this point
+            active[index] = active[-1]
+            active.pop()
+
+    chosen = rng.sample(points, min(count, len(points)))
+    return [(left + x, top + y) for x, y in chosen]